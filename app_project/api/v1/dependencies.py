@@ -1,10 +1,20 @@
+from fastapi import Request
 from fastapi.params import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app_project.database import get_session
+from app_project.repositories.stats_repository import StatsRepository
 from app_project.repositories.task_repository import TaskRepository
+from app_project.services.stats_service import StatsService
+from app_project.services.task_cache import task_cache
 from app_project.services.task_service import TaskService
 
 
-def get_task_service(session: AsyncSession = Depends(get_session)) -> TaskService:
-    return TaskService(TaskRepository(session))
\ No newline at end of file
+def get_task_service(request: Request, session: AsyncSession = Depends(get_session)) -> TaskService:
+    state = request.app.state
+    return TaskService(TaskRepository(session), getattr(state, "producer", None), task_cache,
+                       getattr(state, "status_listener", None), getattr(state, "task_publisher", None))
+
+
+def get_stats_service(session: AsyncSession = Depends(get_session)) -> StatsService:
+    return StatsService(StatsRepository(session))
\ No newline at end of file
@@ -0,0 +1,24 @@
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=256)
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def model_response(schema: type[BaseModel], obj: Any, status_code: int = 200,
+                   headers: Mapping[str, str] | None = None) -> Response:
+    """Проверяет объект схемой один раз и сериализует его в JSON средствами pydantic-core"""
+    body = schema.model_validate(obj).model_dump_json()
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def list_response(schema: type[BaseModel], objs: Iterable[Any], status_code: int = 200,
+                  headers: Mapping[str, str] | None = None) -> Response:
+    adapter = list_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(list(objs), from_attributes=True))
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
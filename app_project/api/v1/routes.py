@@ -1,8 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi.params import Depends
+from fastapi.responses import StreamingResponse
 
-from app_project.api.v1.dependencies import get_task_service
-from app_project.schemas.task_schema import TaskCreateSchema, TaskFilter, TaskReadSchema, TaskStatusResponse
+from app_project.api.v1.dependencies import get_stats_service, get_task_service
+from app_project.api.v1.responses import list_response, model_response
+from app_project.models.models import Status
+from app_project.schemas.task_schema import (LIST_DEFAULT_FIELDS, CacheStatsResponse, ExportFormat, SortOrder,
+                                             TaskBatchCreateResponse, TaskBatchCreateSchema, TaskBatchItemResult,
+                                             TaskBulkResult, TaskBulkSelection, TaskCreateSchema, TaskFilter,
+                                             TaskListItemSchema, TaskReadSchema, TaskSort, TaskStatusBatchRequest,
+                                             TaskStatusBatchResponse, TaskStatusResponse, partial_task_schema)
+from app_project.schemas.stats_schema import TaskStatsResponse
+from app_project.services.fields import parse_fields
+from app_project.services.stats_service import StatsService
+from app_project.services.task_cache import task_cache
 from app_project.services.task_service import TaskService
 
 router = APIRouter(prefix="/api/v1/tasks",
@@ -13,22 +24,115 @@ router = APIRouter(prefix="/api/v1/tasks",
              description="Создает новую задачу для асинхронной обработки")
 async def create_task(task: TaskCreateSchema, service: TaskService = Depends(get_task_service)):
     obj = await service.create(task)
-    return TaskReadSchema.model_validate(obj)
+    return model_response(TaskReadSchema, obj, status_code=201)
 
 
-@router.get("/", response_model=list[TaskReadSchema], status_code=200,
-            summary="Получить список задач", description="Список задач с фильтрацией и пагинацией")
-async def get_list_tasks(filters: TaskFilter = Depends(), limit: int = 10, cursor_id: int | None = None,
+@router.post("/batch", response_model=TaskBatchCreateResponse, status_code=200, summary="Создать задачи пакетом",
+             description="Создает много задач одним запросом, дубликаты по описанию пропускаются")
+async def create_tasks_batch(batch: TaskBatchCreateSchema, service: TaskService = Depends(get_task_service)):
+    task_ids = await service.create_many(batch.tasks)
+    items = [TaskBatchItemResult(index=index, id=task_id, result="created" if task_id is not None else "duplicate")
+             for index, task_id in enumerate(task_ids)]
+    created = sum(1 for item in items if item.result == "created")
+    return model_response(TaskBatchCreateResponse,
+                          TaskBatchCreateResponse(created=created, duplicates=len(items) - created, items=items))
+
+
+@router.post("/bulk/cancel", response_model=TaskBulkResult, status_code=200, summary="Отменить задачи пакетом",
+             description="Отменяет задачи по списку ID или фильтру одним запросом к БД")
+async def cancel_tasks_bulk(selection: TaskBulkSelection, service: TaskService = Depends(get_task_service)):
+    return model_response(TaskBulkResult, await service.cancel_many(selection))
+
+
+@router.post("/bulk/delete", response_model=TaskBulkResult, status_code=200, summary="Удалить задачи пакетом",
+             description="Удаляет задачи по списку ID или фильтру, завершенные задачи пропускаются")
+async def delete_tasks_bulk(selection: TaskBulkSelection, service: TaskService = Depends(get_task_service)):
+    return model_response(TaskBulkResult, await service.delete_many(selection))
+
+
+@router.post("/bulk/requeue", response_model=TaskBulkResult, status_code=200,
+             summary="Перезапустить упавшие задачи",
+             description="Возвращает задачи в статусе failed в статус new со сбросом попыток, ошибок и времени "
+                         "выполнения, задачи в других статусах пропускаются")
+async def requeue_tasks_bulk(selection: TaskBulkSelection, service: TaskService = Depends(get_task_service)):
+    return model_response(TaskBulkResult, await service.requeue_failed(selection))
+
+
+@router.post("/status:batch", response_model=TaskStatusBatchResponse, status_code=200,
+             summary="Получить статусы задач пакетом",
+             description="Статусы нескольких задач одним запросом, ненайденные ID возвращаются в missing")
+async def get_task_statuses_batch(batch: TaskStatusBatchRequest, service: TaskService = Depends(get_task_service)):
+    statuses, missing = await service.get_statuses(batch.ids)
+    return model_response(TaskStatusBatchResponse, TaskStatusBatchResponse(statuses=statuses, missing=missing))
+
+
+@router.get("/", response_model=list[TaskListItemSchema], status_code=200,
+            summary="Получить список задач",
+            description="Список задач с фильтрацией и keyset-пагинацией, курсор следующей страницы "
+                        "возвращается в заголовке X-Next-Cursor. По умолчанию result и errors не возвращаются, "
+                        "набор полей задается параметром fields: тогда в ответе только запрошенные поля и id")
+async def get_list_tasks(filters: TaskFilter = Depends(), limit: int = 10,
+                         cursor: str | None = None, sort: TaskSort = TaskSort.ID, order: SortOrder = SortOrder.ASC,
+                         fields: str | None = Query(default=None, examples=["id,status"],
+                                                    description="Поля задачи через запятую, id возвращается всегда"),
                          service: TaskService = Depends(get_task_service)):
-    lst_tasks = await service.get_list(filters, limit, cursor_id)
-    return [TaskReadSchema.model_validate(t) for t in lst_tasks]
+    selected = parse_fields(fields, LIST_DEFAULT_FIELDS)
+    lst_tasks, next_cursor = await service.get_list(filters, limit, cursor, sort, order, fields=selected)
+
+    schema = partial_task_schema(selected)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
+    return list_response(schema, lst_tasks, headers=headers)
+
+
+@router.get("/export", status_code=200, summary="Выгрузить задачи",
+            description="Потоковая выгрузка всех задач по фильтру в NDJSON или CSV",
+            response_class=StreamingResponse)
+async def export_tasks(filters: TaskFilter = Depends(),
+                       export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+                       service: TaskService = Depends(get_task_service)):
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(service.export(filters, export_format), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="tasks.{export_format.value}"'})
+
+
+@router.get("/stats", response_model=TaskStatsResponse, status_code=200, summary="Статистика задач",
+            description="Количество задач по статусам и приоритетам и перцентили ожидания и выполнения за окно. "
+                        "Считается по агрегатам, которые триггеры ведут при каждом изменении задач")
+async def get_task_stats(window_minutes: int = Query(default=60, description="Окно для перцентилей, минут"),
+                         service: StatsService = Depends(get_stats_service)):
+    return model_response(TaskStatsResponse, await service.get_stats(window_minutes))
+
+
+@router.get("/cache/stats", response_model=CacheStatsResponse, status_code=200, summary="Статистика кэша",
+            description="Попадания и промахи кэша чтений задач и статусов в этом процессе")
+async def get_cache_stats():
+    return CacheStatsResponse(**task_cache.stats())
+
+
+@router.get("/events", status_code=200, summary="Подписаться на статусы задач",
+            description="Server-Sent Events: текущие статусы задач, затем каждое изменение статуса, пока все задачи "
+                        "не завершатся или не будут отменены (после failed возможен повтор). Пока изменений нет, "
+                        "периодически отправляется keepalive-комментарий",
+            response_class=StreamingResponse)
+async def stream_task_statuses(ids: list[int] = Query(description="ID задач, можно передать несколько раз"),
+                               service: TaskService = Depends(get_task_service)):
+    events = await service.watch_statuses(ids)
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @router.get("/{task_id}", response_model=TaskReadSchema, status_code=200, summary="Получить задачу",
-            description="Получает задачу по ID")
-async def get_task(task_id: int, service: TaskService = Depends(get_task_service)):
-    obj = await service.get_by_id(task_id)
-    return TaskReadSchema.model_validate(obj)
+            description="Получает задачу по ID, набор полей задается параметром fields")
+async def get_task(task_id: int,
+                   fields: str | None = Query(default=None, examples=["id,status,result"],
+                                              description="Поля задачи через запятую, id возвращается всегда"),
+                   service: TaskService = Depends(get_task_service)):
+    if fields is None:
+        return model_response(TaskReadSchema, await service.get_by_id(task_id))
+
+    selected = parse_fields(fields)
+    obj = await service.get_by_id(task_id, selected)
+    return model_response(partial_task_schema(selected), obj)
 
 
 @router.delete("/{task_id}", status_code=200, summary="Удалить задачу", description="Удалить задачу по ID")
@@ -37,6 +141,13 @@ async def delete_task(task_id: int, service: TaskService = Depends(get_task_serv
     return {"detail": "deleted"}
 
 
+@router.post("/{task_id}/cancel", response_model=TaskStatusResponse, status_code=200, summary="Отменить задачу",
+             description="Отменяет задачу и останавливает ее выполнение, если она уже запущена")
+async def cancel_task(task_id: int, service: TaskService = Depends(get_task_service)):
+    await service.cancel(task_id)
+    return TaskStatusResponse(status=Status.CANCELLED)
+
+
 @router.get("/{task_id}/status", response_model=TaskStatusResponse, status_code=200, summary="Полуть статус задачи",
             description="Получает статус задачи по ID")
 async def get_task_status(task_id: int, service: TaskService = Depends(get_task_service)):
@@ -8,6 +8,25 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
 
+    TASK_CACHE_SIZE: int = 10000
+    TASK_CACHE_TTL: float = 1.0
+
+    SSE_KEEPALIVE_INTERVAL: float = 15.0
+    SSE_MAX_TASKS: int = 100
+
+    # Longest /stats window, older latency buckets are pruned by the maintenance job
+    STATS_MAX_WINDOW_MINUTES: int = 7 * 24 * 60
+
+    RESULT_INLINE_LIMIT: int = 8192
+    RESULT_COMPRESSION_LEVEL: int = 3
+
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 6
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+    PARTITION_DROP_ARCHIVED: bool = False
+    PARTITION_LOCK_TIMEOUT: str = "5s"
+    MAINTENANCE_INTERVAL: float = 3600.0
+
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -1,14 +1,16 @@
 import asyncio
 import json
 import logging
-from random import randint
 
-from aio_pika import connect_robust, IncomingMessage
+from aio_pika import connect_robust, DeliveryMode, IncomingMessage, Message
 
-from app_project.consumer.consumer_repository import ConsumerRepository
-from app_project.models.models import Tasks, Status
+from app_project.consumer.consumer_repository import IllegalTransition
+from app_project.consumer.handlers import registry
+from app_project.consumer.retry import backoff_delay
+from app_project.consumer.status_writer import StatusWriter
+from app_project.models.models import Status, Priority
 from app_project.rabbit_config import mq_settings
-from app_project.database import session_context
+from app_project.rabbit_topology import declare_cancel_exchange, declare_task_queue, declare_topology
 
 logger = logging.getLogger(__name__)
 
@@ -17,44 +19,39 @@ class TaskCancelled(Exception):
     pass
 
 
-async def process_task(task_data: dict) -> bool:
-    repo = ConsumerRepository()
+async def process_task(task_data: dict, writer: StatusWriter, resume: bool = False) -> bool:
+    task_id = task_data.get("id")
+    allowed = (Status.PENDING, Status.IN_PROGRESS) if resume else None
 
     try:
-        task_id = task_data.get("id")
-        data = task_data.get("description", "")
-
-        async with session_context() as session:
-
-            task = await session.get(Tasks, task_id)
-            if task.status == Status.CANCELLED:
-                raise TaskCancelled(f"Task {task_id} cancelled")
-
-            await repo.update_to_in_progress(session, task_id)
-
-            await asyncio.sleep(randint(1, 7))
-
-            await repo.update_to_completed(session, task_id)
-
-        return True
-
-    except TaskCancelled:
-        raise
-
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        await writer.write(task_id, Status.IN_PROGRESS, started=True, allowed=allowed)
+    except IllegalTransition as e:
+        if e.current == Status.CANCELLED:
+            raise TaskCancelled(f"Task {task_id} cancelled")
+        logger.warning(f"Task skipped: {e}")
+        return False
 
-        await repo.update_to_failed(task_data.get("id"), e)
+    result = await registry.run(task_data)
 
+    try:
+        await writer.write(task_id, Status.COMPLETED, completed=True, result=result)
+    except IllegalTransition as e:
+        logger.info(f"Task result discarded: {e}")
         return False
 
+    return True
+
 
 class RabbitMQConsumer:
     def __init__(self):
-        self.queue_name = mq_settings.RABBITMQ_QUEUE
         self.connection = None
         self.channel = None
-        self.queue = None
+        self.queues = {}
+        self.cancel_queue = None
+        # A redelivered or duplicate message can run next to the original, every job of a task is tracked
+        self.running: dict[int, set[asyncio.Task]] = {}
+        self.slots = asyncio.Semaphore(mq_settings.CONSUMER_CONCURRENCY)
+        self.writer = StatusWriter()
         self.is_consuming = False
 
     async def connect(self):
@@ -66,46 +63,152 @@ class RabbitMQConsumer:
             virtualhost="/"
         )
 
-        self.channel = await self.connection.channel()
-
-        await self.channel.set_qos(prefetch_count=1)
+        self.channel = await self.connection.channel(publisher_confirms=True, on_return_raises=True)
 
     async def setup_queue(self):
-        self.queue = await self.channel.declare_queue(
-            self.queue_name,
-            durable=True
-        )
+        await declare_topology(self.channel)
+
+        for priority in Priority:
+            channel = await self.connection.channel()
+
+            await channel.set_qos(prefetch_count=self.prefetch_for(priority))
+
+            self.queues[priority] = await declare_task_queue(channel, priority)
+
+        cancel_exchange = await declare_cancel_exchange(self.channel)
+        self.cancel_queue = await self.channel.declare_queue(exclusive=True, auto_delete=True)
+        await self.cancel_queue.bind(cancel_exchange)
+
+    @staticmethod
+    def prefetch_for(priority: Priority) -> int:
+        concurrency = mq_settings.CONSUMER_CONCURRENCY
+        weights = {p: max(1, mq_settings.CONSUMER_QUEUE_WEIGHTS.get(p, 1)) for p in Priority}
+        quotas = {p: concurrency * weight / sum(weights.values()) for p, weight in weights.items()}
+        shares = {p: int(quota) for p, quota in quotas.items()}
+
+        # Largest remainder: the slots lost to rounding down go to the largest fractions,
+        # so the prefetch counts add up to CONSUMER_CONCURRENCY
+        leftover = concurrency - sum(shares.values())
+        for p in sorted(quotas, key=lambda p: quotas[p] - shares[p], reverse=True)[:leftover]:
+            shares[p] += 1
+
+        # prefetch_count 0 means unlimited, an empty share borrows a slot from the largest one
+        for p in Priority:
+            if shares[p] == 0:
+                largest = max(shares, key=shares.get)
+                if shares[largest] > 1:
+                    shares[largest] -= 1
+                shares[p] = 1
+
+        return shares[priority]
 
     async def process_message(self, message: IncomingMessage):
-        async with message.process():
+        async with self.slots:
             try:
                 task_data = json.loads(message.body.decode())
-                success = await process_task(task_data)
+                Priority(task_data["priority"])
+            except (ValueError, KeyError, TypeError) as e:
+                # Malformed messages never get better on redelivery, they go straight to the DLQ
+                logger.error(f"Invalid task message {message.body!r}: {e}")
+                await message.reject(requeue=False)
+                return
+
+            attempt = int((message.headers or {}).get("x-attempt", 1))
+            task_id = task_data.get("id")
+
+            job = asyncio.create_task(process_task(task_data, self.writer, resume=message.redelivered or attempt > 1))
+            self.running.setdefault(task_id, set()).add(job)
+
+            try:
+                await job
+                await message.ack()
 
             except TaskCancelled as e:
                 logger.info(f"Task cancelled: {e}")
+                await message.ack()
 
-            except json.JSONDecodeError as e:
-                logger.error(f"Message is not JSON: {e}")
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                logger.info(f"Task cancelled while running: {task_id}")
+                await message.ack()
 
             except Exception as e:
                 logger.error(f"Unexpected error: {e}")
+                await self.handle_failure(message, task_data, attempt, e)
+
+            finally:
+                jobs = self.running.get(task_id)
+                if jobs is not None:
+                    jobs.discard(job)
+                    if not jobs:
+                        del self.running[task_id]
+
+    async def process_cancel(self, message: IncomingMessage):
+        async with message.process():
+            try:
+                task_ids = json.loads(message.body.decode()).get("ids", [])
+            except json.JSONDecodeError as e:
+                logger.error(f"Cancel message is not JSON: {e}")
+                return
 
-                repo = ConsumerRepository()
-                await repo.update_to_failed(task_data.get("id"), e)
+            for task_id in task_ids:
+                for job in self.running.get(task_id, ()):
+                    job.cancel()
 
-                raise
+    async def handle_failure(self, message: IncomingMessage, task_data: dict, attempt: int, error: Exception):
+        task_id = task_data.get("id")
+        retry = attempt < mq_settings.CONSUMER_MAX_ATTEMPTS
+
+        try:
+            if retry:
+                await self.writer.write(task_id, Status.PENDING, error=str(error),
+                                        allowed=(Status.PENDING, Status.IN_PROGRESS))
+            else:
+                await self.writer.write(task_id, Status.FAILED, error=str(error))
+
+        except IllegalTransition as e:
+            logger.info(f"Task failure ignored: {e}")
+            await message.ack()
+            return
+
+        except Exception as e:
+            logger.error(f"Failure of task {task_id} not recorded: {e}")
+            if not retry:
+                # Dead-lettering now would leave the task IN_PROGRESS forever, redeliver to record FAILED
+                await message.nack(requeue=True)
+                return
+
+        if not retry:
+            await message.reject(requeue=False)
+            return
+
+        try:
+            await self.channel.default_exchange.publish(
+                Message(message.body, headers={"x-attempt": attempt + 1}, delivery_mode=DeliveryMode.PERSISTENT,
+                        expiration=backoff_delay(attempt)),
+                routing_key=mq_settings.delay_queue_for(task_data.get("priority", Priority.LOW), attempt)
+            )
+            await message.ack()
+
+        except Exception as e:
+            logger.error(f"Retry of task {task_id} not scheduled: {e}")
+            await message.nack(requeue=True)
 
     async def start_consuming(self):
         if not self.connection:
             await self.connect()
-        if not self.queue:
+        if not self.queues:
             await self.setup_queue()
 
         self.is_consuming = True
+        self.writer.start()
 
         try:
-            await self.queue.consume(self.process_message)
+            await self.cancel_queue.consume(self.process_cancel)
+
+            for queue in self.queues.values():
+                await queue.consume(self.process_message)
 
             await asyncio.Future()
 
@@ -124,6 +227,11 @@ class RabbitMQConsumer:
         if self.connection and not self.connection.is_closed:
             await self.connection.close()
 
+        await self.writer.stop()
+
+        # Waiting for the handler pools to finish must not block the event loop
+        await asyncio.to_thread(registry.shutdown)
+
 
 async def start_consumer():
     consumer = RabbitMQConsumer()
@@ -1,53 +1,70 @@
-from sqlalchemy import update, func
+import asyncio
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app_project.models.models import Tasks, Status
-from app_project.database import session_context
+from app_project.models.models import Status
+from app_project.result_store import encode_result
+
+
+class IllegalTransition(Exception):
+
+    def __init__(self, task_id: int, status: Status, current: Status | None):
+        self.task_id = task_id
+        self.status = status
+        self.current = current
+        super().__init__(f"Task {task_id}: {current.value if current else 'missing'} -> {status.value} not allowed")
 
 
 class ConsumerRepository:
 
-    async def get_task_and_check_cancelled(self, session: AsyncSession, task_id: int) -> None:
-        task = await session.get(Tasks, task_id)
-        if task.status == Status.CANCELLED:
-            raise Exception(f"Task {task_id} cancelled")
-
-    async def update_to_in_progress(self, session: AsyncSession, task_id: int) -> None:
-        stmt = (
-            update(Tasks)
-            .where(Tasks.id == task_id)
-            .values(started_at=func.timezone('utc', func.now()))
-        )
-
-        update_stmt = (
-            update(Tasks)
-            .where(Tasks.id == task_id)
-            .values(status=Status.IN_PROGRESS)
-        )
-
-        await session.execute(stmt)
-        await session.execute(update_stmt)
-        await session.commit()
-
-    async def update_to_completed(self, session: AsyncSession, task_id: int) -> None:
-        completed_stmt = (
-            update(Tasks)
-            .where(Tasks.id == task_id)
-            .values(
-                status=Status.COMPLETED,
-                result={"message": "successfully"},
-                completed_at=func.timezone('utc', func.now())
+    async def apply_transitions(self, session: AsyncSession, transitions: list) -> dict[int, Status | None]:
+        stmt = text("""
+            WITH v AS (
+                SELECT *
+                FROM unnest(CAST(:ids AS integer[]), CAST(:statuses AS text[]), CAST(:allowed AS text[]),
+                            CAST(:started AS boolean[]), CAST(:completed AS boolean[]),
+                            CAST(:results AS text[]), CAST(:blobs AS bytea[]), CAST(:errors AS text[]))
+                     AS v(id, status, allowed, started, completed, result, blob, errors)
+            ), updated AS (
+                UPDATE tasks AS t
+                SET status = v.status::status,
+                    started_at = CASE WHEN v.started THEN timezone('utc', now()) ELSE t.started_at END,
+                    completed_at = CASE WHEN v.completed THEN timezone('utc', now()) ELSE t.completed_at END,
+                    attempts = t.attempts + CASE WHEN v.started THEN 1 ELSE 0 END,
+                    result = CASE WHEN v.blob IS NOT NULL THEN NULL ELSE COALESCE(v.result::jsonb, t.result) END,
+                    result_external = CASE WHEN v.blob IS NOT NULL THEN true
+                                           WHEN v.result IS NOT NULL THEN false
+                                           ELSE t.result_external END,
+                    errors = COALESCE(v.errors, t.errors)
+                FROM v
+                WHERE t.id = v.id AND t.status::text = ANY(string_to_array(v.allowed, ','))
+                RETURNING t.id, v.blob, v.result IS NOT NULL AS inline
+            ), stored AS (
+                INSERT INTO task_results (task_id, data)
+                SELECT id, blob FROM updated WHERE blob IS NOT NULL
+                ON CONFLICT (task_id) DO UPDATE SET data = EXCLUDED.data
+            ), replaced AS (
+                DELETE FROM task_results AS r USING updated AS u WHERE r.task_id = u.id AND u.inline
             )
-        )
+            SELECT v.id, t.status::text AS current
+            FROM v LEFT JOIN tasks AS t ON t.id = v.id
+            WHERE NOT EXISTS (SELECT 1 FROM updated WHERE updated.id = v.id)
+        """)
 
-        await session.execute(completed_stmt)
-        await session.commit()
+        # zstd on a large result would stall every in-flight task sharing the event loop
+        if any(t.result is not None for t in transitions):
+            encoded = await asyncio.to_thread(lambda: [encode_result(t.result) for t in transitions])
+        else:
+            encoded = [(None, None)] * len(transitions)
 
-    async def update_to_failed(self, task_id: int, error: Exception = None) -> None:
-        async with session_context() as session:
-            update_stmt = (
-                update(Tasks)
-                .where(Tasks.id == task_id)
-                .values(status=Status.FAILED, errors=str(error) if error else None)
-            )
-            await session.execute(update_stmt)
-            await session.commit()
+        result = await session.execute(stmt, {
+            "ids": [t.task_id for t in transitions],
+            "statuses": [t.status.name for t in transitions],
+            "allowed": [",".join(s.name for s in t.allowed) for t in transitions],
+            "started": [t.started for t in transitions],
+            "completed": [t.completed for t in transitions],
+            "results": [inline for inline, _ in encoded],
+            "blobs": [blob for _, blob in encoded],
+            "errors": [t.error for t in transitions],
+        })
+        return {row.id: Status[row.current] if row.current else None for row in result}
@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from random import randint
+from typing import Any, Callable
+
+from app_project.rabbit_config import mq_settings
+
+
+class ExecutorKind(str, Enum):
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class TaskHandler:
+    def __init__(self, func: Callable[[dict], Any], executor: ExecutorKind):
+        self.func = func
+        self.executor = executor
+
+
+class HandlerRegistry:
+    """Обработчики задач по названию (title) с выбором среды выполнения"""
+
+    def __init__(self):
+        self.handlers: dict[str, TaskHandler] = {}
+        self.default: TaskHandler | None = None
+        self.thread_pool: ThreadPoolExecutor | None = None
+        self.process_pool: ProcessPoolExecutor | None = None
+
+    def register(self, title: str | None = None, executor: ExecutorKind = ExecutorKind.ASYNC):
+        def decorator(func: Callable[[dict], Any]) -> Callable[[dict], Any]:
+            handler = TaskHandler(func, executor)
+            if title is None:
+                self.default = handler
+            else:
+                self.handlers[title] = handler
+            return func
+
+        return decorator
+
+    def get(self, title: str | None) -> TaskHandler:
+        handler = self.handlers.get(title, self.default)
+        if handler is None:
+            raise LookupError(f"No handler registered for task '{title}'")
+        return handler
+
+    def _pool(self, executor: ExecutorKind) -> Executor:
+        if executor == ExecutorKind.THREAD:
+            if self.thread_pool is None:
+                self.thread_pool = ThreadPoolExecutor(max_workers=mq_settings.CONSUMER_THREAD_WORKERS)
+            return self.thread_pool
+
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(max_workers=mq_settings.CONSUMER_PROCESS_WORKERS)
+        return self.process_pool
+
+    async def run(self, task_data: dict) -> dict:
+        handler = self.get(task_data.get("title"))
+
+        if handler.executor == ExecutorKind.ASYNC:
+            result = await handler.func(task_data)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool(handler.executor), handler.func, task_data)
+
+        return result if isinstance(result, dict) else {"result": result}
+
+    def shutdown(self):
+        for pool in (self.thread_pool, self.process_pool):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        self.thread_pool = None
+        self.process_pool = None
+
+
+registry = HandlerRegistry()
+
+
+@registry.register()
+async def default_handler(task_data: dict) -> dict:
+    await asyncio.sleep(randint(1, 7))
+    return {"message": "successfully"}
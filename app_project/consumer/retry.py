@@ -0,0 +1,8 @@
+from random import uniform
+
+from app_project.rabbit_config import mq_settings
+
+
+def backoff_delay(attempt: int) -> float:
+    delay = min(mq_settings.CONSUMER_RETRY_MAX_DELAY, mq_settings.CONSUMER_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return delay / 2 + uniform(0, delay / 2)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+from app_project.consumer.consumer_repository import ConsumerRepository, IllegalTransition
+from app_project.database import session_context
+from app_project.models.models import ALLOWED_TRANSITIONS, Status
+from app_project.rabbit_config import mq_settings
+
+logger = logging.getLogger(__name__)
+
+
+class StatusTransition:
+    def __init__(self, task_id: int, status: Status, started: bool = False, completed: bool = False,
+                 result: dict | None = None, error: str | None = None, allowed: tuple[Status, ...] | None = None):
+        self.task_id = task_id
+        self.status = status
+        self.allowed = allowed or ALLOWED_TRANSITIONS[status]
+        self.started = started
+        self.completed = completed
+        self.result = result
+        self.error = error
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class StatusWriter:
+    """Копит переходы статусов и записывает их одним UPDATE за окно CONSUMER_STATUS_FLUSH_INTERVAL"""
+
+    def __init__(self, repository: ConsumerRepository | None = None):
+        self.repository = repository or ConsumerRepository()
+        self.pending: list[StatusTransition] = []
+        self.wakeup = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.flusher: asyncio.Task | None = None
+
+    def start(self):
+        if self.flusher is None:
+            self.flusher = asyncio.create_task(self._run())
+
+    async def write(self, task_id: int, status: Status, **values) -> bool:
+        transition = StatusTransition(task_id, status, **values)
+        self.pending.append(transition)
+
+        if len(self.pending) >= mq_settings.CONSUMER_STATUS_BATCH_SIZE:
+            self.wakeup.set()
+
+        return await transition.future
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=mq_settings.CONSUMER_STATUS_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+            self.wakeup.clear()
+            await self.flush()
+
+    def _next_batch(self) -> list[StatusTransition]:
+        # One UPDATE ... FROM can apply only one row per task, later transitions wait for the next batch
+        batch, rest, seen = [], [], set()
+        for transition in self.pending:
+            if transition.task_id in seen or len(batch) >= mq_settings.CONSUMER_STATUS_BATCH_SIZE:
+                rest.append(transition)
+            else:
+                seen.add(transition.task_id)
+                batch.append(transition)
+
+        self.pending = rest
+        return batch
+
+    async def flush(self):
+        async with self.lock:
+            while self.pending:
+                batch = self._next_batch()
+
+                try:
+                    async with session_context() as session:
+                        rejected = await self.repository.apply_transitions(session, batch)
+                        await session.commit()
+
+                except Exception as e:
+                    logger.error(f"Status flush failed: {e}")
+                    for transition in batch:
+                        if not transition.future.done():
+                            transition.future.set_exception(e)
+                    continue
+
+                for transition in batch:
+                    if transition.future.done():
+                        continue
+                    if transition.task_id in rejected:
+                        transition.future.set_exception(
+                            IllegalTransition(transition.task_id, transition.status, rejected[transition.task_id]))
+                    else:
+                        transition.future.set_result(True)
+
+    async def stop(self):
+        if self.flusher is not None:
+            self.flusher.cancel()
+            try:
+                await self.flusher
+            except asyncio.CancelledError:
+                pass
+            self.flusher = None
+
+        await self.flush()
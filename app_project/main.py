@@ -1,8 +1,50 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app_project.api.v1.routes import router
 from app_project.error_handler import handle_app_error, handle_any_error
 from app_project.exceptions import AppError
+from app_project.producer.producer import RabbitMQProducer, TaskPublisher
+from app_project.rabbit_config import mq_settings
+from app_project.services.status_listener import StatusListener
+from app_project.services.task_cache import task_cache
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.producer = None
+    app.state.task_publisher = None
+
+    producer = RabbitMQProducer()
+    try:
+        await producer.connect()
+        app.state.producer = producer
+        if mq_settings.PUBLISH_ON_CREATE:
+            app.state.task_publisher = TaskPublisher(producer)
+    except Exception as e:
+        logger.warning(f"Broker unavailable, publish on create and cancel broadcasts disabled: {e}")
+
+    app.state.status_listener = None
+
+    listener = StatusListener(task_cache)
+    try:
+        await listener.start()
+        app.state.status_listener = listener
+    except Exception as e:
+        logger.warning(f"Status LISTEN connection unavailable, status streaming disabled: {e}")
+
+    yield
+
+    if app.state.status_listener is not None:
+        await app.state.status_listener.stop()
+
+    if app.state.producer is not None:
+        await app.state.producer.close()
+
 
 app = FastAPI(
     title="Task processing API",
@@ -13,7 +55,9 @@ app = FastAPI(
 
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+
+    lifespan=lifespan
 )
 
 app.add_exception_handler(AppError, handle_app_error)
@@ -0,0 +1,85 @@
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+from app_project.models.models import Status
+
+PARTITION_NAME = re.compile(r"^tasks_p(\d{4})_(\d{2})$")
+
+# A partition is kept while any of its tasks can still change, failed tasks can be requeued
+RETAINED_STATUSES = (Status.NEW, Status.PENDING, Status.IN_PROGRESS, Status.FAILED)
+ACTIVE_NAMES = ", ".join(f"'{status.name}'" for status in RETAINED_STATUSES)
+
+
+class PartitionRepository:
+    async def create_future_partitions(self, session, months: int) -> int:
+        result = await session.execute(
+            text("SELECT create_task_partitions(date_trunc('month', timezone('utc', now()))::date, :months)"),
+            {"months": months})
+        await session.commit()
+        return result.scalar_one()
+
+    async def count_default_rows(self, session) -> int:
+        result = await session.execute(text("SELECT count(*) FROM tasks_default"))
+        return result.scalar_one()
+
+    async def list_partitions(self, session) -> dict[str, date]:
+        result = await session.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits AS i JOIN pg_class AS c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'tasks'::regclass
+        """))
+
+        partitions = {}
+        for name in result.scalars():
+            match = PARTITION_NAME.match(name)
+            if match:
+                partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+        return partitions
+
+    async def detach_partition(self, session, name: str, archive_schema: str | None, lock_timeout: str) -> bool:
+        """Отсоединяет партицию, если в ней только завершенные и отмененные задачи, и переносит ее в архив или удаляет.
+
+        DETACH берет ACCESS EXCLUSIVE на tasks: пока он ждет блокировку, все запросы к tasks встают за ним
+        в очередь, не дольше lock_timeout. CONCURRENTLY невозможен из-за партиции по умолчанию, поэтому
+        блокировка берется только для партиций без активных задач.
+        """
+        if not PARTITION_NAME.match(name):
+            raise ValueError(f"Not a tasks partition: {name}")
+
+        if await self._has_active_tasks(session, name):
+            await session.rollback()
+            return False
+
+        await session.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+        await session.execute(text(f"ALTER TABLE tasks DETACH PARTITION {name}"))
+
+        # Checked again after the detach, the partition can no longer change under us
+        if await self._has_active_tasks(session, name):
+            await session.rollback()
+            return False
+
+        # Row triggers do not fire on detach, the rollups and digests are corrected by hand
+        await session.execute(text(f"""
+            INSERT INTO task_status_counts (status, priority, slot, count)
+            SELECT status, priority, 0, -count(*) FROM {name} GROUP BY status, priority
+            ON CONFLICT (status, priority, slot) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count
+        """))
+        await session.execute(text(f"DELETE FROM task_digests AS d USING {name} AS p WHERE d.task_id = p.id"))
+
+        if archive_schema is None:
+            # Offloaded results of archived rows are kept so the archive stays readable
+            await session.execute(text(f"DELETE FROM task_results AS r USING {name} AS p WHERE r.task_id = p.id"))
+            await session.execute(text(f"DROP TABLE {name}"))
+        else:
+            await session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+            await session.execute(text(f'ALTER TABLE {name} SET SCHEMA "{archive_schema}"'))
+
+        await session.commit()
+        return True
+
+    @staticmethod
+    async def _has_active_tasks(session, name: str) -> bool:
+        result = await session.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE status IN ({ACTIVE_NAMES}))"))
+        return result.scalar_one()
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app_project.config import settings
+from app_project.database import session_context
+from app_project.exceptions import DatabaseError
+from app_project.maintenance.partition_repository import PartitionRepository
+from app_project.repositories.stats_repository import StatsRepository
+from app_project.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+
+def retention_cutoff(today: date, retention_months: int) -> date:
+    """Первый месяц, который еще хранится: партиции раньше него уходят в архив"""
+    months = today.year * 12 + today.month - 1 - retention_months
+    return date(months // 12, months % 12 + 1, 1)
+
+
+async def run_maintenance(repo: PartitionRepository, today: date | None = None) -> dict:
+    today = today or datetime.now(timezone.utc).date()
+    archive_schema = None if settings.PARTITION_DROP_ARCHIVED else settings.PARTITION_ARCHIVE_SCHEMA
+
+    async with session_context() as session:
+        created = await repo.create_future_partitions(session, settings.PARTITION_MONTHS_AHEAD + 1)
+
+    async with session_context() as session:
+        default_rows = await repo.count_default_rows(session)
+        partitions = await repo.list_partitions(session)
+
+    if default_rows:
+        logger.warning(f"{default_rows} tasks are in tasks_default, partitions do not cover their created_at")
+
+    cutoff = retention_cutoff(today, settings.PARTITION_RETENTION_MONTHS)
+    archived, kept = [], []
+    for name, month in sorted(partitions.items(), key=lambda item: item[1]):
+        if month >= cutoff:
+            continue
+
+        async with session_context() as session:
+            try:
+                if await repo.detach_partition(session, name, archive_schema, settings.PARTITION_LOCK_TIMEOUT):
+                    archived.append(name)
+                else:
+                    kept.append(name)
+                    logger.warning(f"Partition {name} still has unfinished tasks, kept attached")
+            except SQLAlchemyError as e:
+                await session.rollback()
+                kept.append(name)
+                logger.error(f"Failed to detach partition {name}: {e}")
+
+    if created or archived:
+        logger.info(f"Partitions created: {created}, archived: {archived}")
+    return {"created": created, "archived": archived, "kept": kept, "default_rows": default_rows}
+
+
+async def maintenance_worker():
+    repo = PartitionRepository()
+
+    try:
+        while True:
+            try:
+                await run_maintenance(repo)
+            except SQLAlchemyError as e:
+                logger.error(f"Partition maintenance failed: {e}")
+
+            try:
+                async with session_context() as session:
+                    pruned = await StatsService(StatsRepository(session)).prune_latency_buckets()
+                if pruned:
+                    logger.info(f"Latency buckets pruned: {pruned}")
+            except DatabaseError as e:
+                logger.error(f"Latency bucket pruning failed: {e}")
+
+            await asyncio.sleep(settings.MAINTENANCE_INTERVAL)
+
+    except KeyboardInterrupt:
+        logger.info("Partition maintenance stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(maintenance_worker())
@@ -50,6 +50,12 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # The integration tests migrate their own database through a connection they pass in
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -57,12 +63,16 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        run_migrations(connection)
+
 
-        with context.begin_transaction():
-            context.run_migrations()
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,48 @@
+"""notify task status changes from triggers
+
+Revision ID: 3a9d7c1f5b62
+Revises: 8b3f6d1e2a57
+Create Date: 2026-02-11 15:42:09.118374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app_project.models.models import TASK_STATUS_CHANNEL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d7c1f5b62'
+down_revision: Union[str, Sequence[str], None] = '8b3f6d1e2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One notification per changed row whatever the writer is: producer, consumer or API.
+# The channel is passed as the trigger argument.
+NOTIFY_UPDATE_FUNCTION = """
+CREATE FUNCTION task_status_notify_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], json_build_object('id', n.id, 'status', n.status)::text)
+    FROM new_rows AS n JOIN old_rows AS o ON o.id = n.id
+    WHERE n.status IS DISTINCT FROM o.status;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NOTIFY_UPDATE_FUNCTION)
+    op.execute("CREATE TRIGGER task_status_notify_update AFTER UPDATE ON tasks "
+               "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+               f"FOR EACH STATEMENT EXECUTE FUNCTION task_status_notify_update('{TASK_STATUS_CHANNEL}')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS task_status_notify_update ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_status_notify_update()")
@@ -0,0 +1,28 @@
+"""add task attempts
+
+Revision ID: 3c7e1f9a2b48
+Revises: f25151d5d098
+Create Date: 2026-01-12 19:04:11.532817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e1f9a2b48'
+down_revision: Union[str, Sequence[str], None] = 'f25151d5d098'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'attempts')
@@ -0,0 +1,39 @@
+"""title trigram and time range indexes
+
+Revision ID: 5d2a8f4c7e19
+Revises: c92b5e7d1a03
+Create Date: 2026-02-02 11:47:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f4c7e19'
+down_revision: Union[str, Sequence[str], None] = 'c92b5e7d1a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_title_trgm', 'tasks', ['title'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_started_at', 'tasks', ['started_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_completed_at', 'tasks', ['completed_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_completed_at', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_started_at', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_title_trgm', table_name='tasks', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,45 @@
+"""notify task deletions from a trigger
+
+Revision ID: 6c2e9a4b1d73
+Revises: 3a9d7c1f5b62
+Create Date: 2026-02-17 09:26:43.580912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app_project.models.models import TASK_STATUS_CHANNEL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e9a4b1d73'
+down_revision: Union[str, Sequence[str], None] = '3a9d7c1f5b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Deleted tasks are announced on the status channel with a null status
+NOTIFY_DELETE_FUNCTION = """
+CREATE FUNCTION task_status_notify_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], json_build_object('id', o.id, 'status', NULL)::text)
+    FROM old_rows AS o;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NOTIFY_DELETE_FUNCTION)
+    op.execute("CREATE TRIGGER task_status_notify_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+               f"FOR EACH STATEMENT EXECUTE FUNCTION task_status_notify_delete('{TASK_STATUS_CHANNEL}')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS task_status_notify_delete ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_status_notify_delete()")
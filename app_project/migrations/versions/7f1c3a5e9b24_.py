@@ -0,0 +1,218 @@
+"""partition tasks by created_at
+
+Revision ID: 7f1c3a5e9b24
+Revises: e4b7c2a9d316
+Create Date: 2026-03-09 09:21:46.318250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app_project.models.models import TASK_STATUS_CHANNEL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f1c3a5e9b24'
+down_revision: Union[str, Sequence[str], None] = 'e4b7c2a9d316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = "id, title, description, priority, status, created_at, started_at, completed_at, result, errors, attempts"
+
+TASKS_COLUMNS_SQL = """
+    id integer NOT NULL DEFAULT nextval('tasks_id_seq'),
+    title varchar(50) NOT NULL,
+    description text NOT NULL,
+    priority priority NOT NULL,
+    status status NOT NULL,
+    created_at timestamp without time zone NOT NULL DEFAULT timezone('utc', now()),
+    started_at timestamp with time zone,
+    completed_at timestamp with time zone,
+    result json,
+    errors text,
+    attempts integer NOT NULL DEFAULT 0"""
+
+INDEXES = [
+    "CREATE INDEX ix_tasks_created_at_id ON tasks (created_at, id)",
+    "CREATE INDEX ix_tasks_priority_id ON tasks (priority, id)",
+    "CREATE INDEX ix_tasks_status_id ON tasks (status, id)",
+    "CREATE INDEX ix_tasks_new_id ON tasks (id) WHERE status = 'NEW'",
+    "CREATE INDEX ix_tasks_title_trgm ON tasks USING gin (title gin_trgm_ops)",
+    "CREATE INDEX ix_tasks_started_at ON tasks (started_at)",
+    "CREATE INDEX ix_tasks_completed_at ON tasks (completed_at)",
+]
+
+STATS_TRIGGERS = [
+    "CREATE TRIGGER task_stats_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_on_insert()",
+    "CREATE TRIGGER task_stats_update AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_on_update()",
+    "CREATE TRIGGER task_stats_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_on_delete()",
+]
+
+NOTIFY_TRIGGERS = [
+    "CREATE TRIGGER task_status_notify_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    f"FOR EACH STATEMENT EXECUTE FUNCTION task_status_notify_update('{TASK_STATUS_CHANNEL}')",
+    "CREATE TRIGGER task_status_notify_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    f"FOR EACH STATEMENT EXECUTE FUNCTION task_status_notify_delete('{TASK_STATUS_CHANNEL}')",
+]
+
+CREATE_PARTITIONS_FUNCTION = """
+CREATE FUNCTION create_task_partitions(start_month date, months integer) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', start_month)::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 1..months LOOP
+        partition_name := format('tasks_p%s', to_char(month, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, month, (month + interval '1 month')::date);
+            created := created + 1;
+        END IF;
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+# Unique indexes on a partitioned table must contain created_at, so descriptions are
+# checked against task_digests. With app.skip_duplicate_tasks = 'on' a duplicate row is
+# silently skipped (bulk insert), otherwise the insert fails with unique_violation.
+DIGEST_INSERT_FUNCTION = """
+CREATE FUNCTION task_digest_on_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_digests (description_hash, task_id)
+    VALUES (task_description_digest(NEW.description), NEW.id)
+    ON CONFLICT (description_hash) DO NOTHING;
+
+    IF FOUND THEN
+        RETURN NEW;
+    END IF;
+
+    IF current_setting('app.skip_duplicate_tasks', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    RAISE unique_violation USING MESSAGE = 'duplicate key value violates unique constraint "task_digests_pkey"',
+                                 DETAIL = format('Task description already exists, new task %s', NEW.id),
+                                 CONSTRAINT = 'task_digests_pkey', TABLE = 'tasks';
+END
+$$
+"""
+
+DIGEST_DELETE_FUNCTION = """
+CREATE FUNCTION task_digest_on_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM task_digests AS d USING old_rows AS o WHERE d.task_id = o.id;
+    RETURN NULL;
+END
+$$
+"""
+
+DIGEST_TRIGGERS = [
+    "CREATE TRIGGER task_digest_insert BEFORE INSERT ON tasks FOR EACH ROW EXECUTE FUNCTION task_digest_on_insert()",
+    "CREATE TRIGGER task_digest_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_digest_on_delete()",
+]
+
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_unpartitioned")
+    op.execute("ALTER TABLE tasks_unpartitioned RENAME CONSTRAINT tasks_pkey TO tasks_unpartitioned_pkey")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE")
+    for name in ("ix_tasks_created_at_id", "ix_tasks_priority_id", "ix_tasks_status_id", "ix_tasks_new_id",
+                 "ix_tasks_title_trgm", "ix_tasks_started_at", "ix_tasks_completed_at", "ix_tasks_description_hash"):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute(f"""
+        CREATE TABLE tasks ({TASKS_COLUMNS_SQL},
+            CONSTRAINT tasks_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month date := date_trunc('month', coalesce((SELECT min(created_at) FROM tasks_unpartitioned),
+                                                             timezone('utc', now())))::date;
+            this_month date := date_trunc('month', timezone('utc', now()))::date;
+        BEGIN
+            PERFORM create_task_partitions(
+                first_month,
+                ((extract(year FROM this_month) - extract(year FROM first_month)) * 12
+                 + extract(month FROM this_month) - extract(month FROM first_month))::integer + 1 + {PARTITIONS_AHEAD});
+        END
+        $$
+    """)
+    # Safety net for rows outside the prepared months, the maintenance job keeps it empty
+    op.execute("CREATE TABLE tasks_default PARTITION OF tasks DEFAULT")
+
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_unpartitioned")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("DROP TABLE tasks_unpartitioned")
+
+    for index in INDEXES:
+        op.execute(index)
+
+    op.create_table('task_digests',
+                    sa.Column('description_hash', sa.LargeBinary(), nullable=False),
+                    sa.Column('task_id', sa.Integer(), nullable=False),
+                    sa.PrimaryKeyConstraint('description_hash'))
+    op.create_index(op.f('ix_task_digests_task_id'), 'task_digests', ['task_id'], unique=False)
+    # Uniqueness moves to task_digests, tasks no longer carries the hash column
+    op.execute("INSERT INTO task_digests (description_hash, task_id) "
+               "SELECT task_description_digest(description), id FROM tasks")
+
+    op.execute(DIGEST_INSERT_FUNCTION)
+    op.execute(DIGEST_DELETE_FUNCTION)
+    for trigger in DIGEST_TRIGGERS + STATS_TRIGGERS + NOTIFY_TRIGGERS:
+        op.execute(trigger)
+
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_partitioned")
+    op.execute("ALTER TABLE tasks_partitioned RENAME CONSTRAINT tasks_pkey TO tasks_partitioned_pkey")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE")
+    for index in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index.split()[2]}")
+
+    op.execute(f"""
+        CREATE TABLE tasks ({TASKS_COLUMNS_SQL},
+            description_hash bytea GENERATED ALWAYS AS (task_description_digest(description)) STORED NOT NULL,
+            CONSTRAINT tasks_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_partitioned")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("DROP TABLE tasks_partitioned CASCADE")
+
+    for index in INDEXES:
+        op.execute(index)
+    op.execute("CREATE UNIQUE INDEX ix_tasks_description_hash ON tasks (description_hash)")
+    for trigger in STATS_TRIGGERS + NOTIFY_TRIGGERS:
+        op.execute(trigger)
+
+    op.drop_index(op.f('ix_task_digests_task_id'), table_name='task_digests')
+    op.drop_table('task_digests')
+    op.execute("DROP FUNCTION IF EXISTS task_digest_on_delete()")
+    op.execute("DROP FUNCTION IF EXISTS task_digest_on_insert()")
+    op.execute("DROP FUNCTION IF EXISTS create_task_partitions(date, integer)")
@@ -0,0 +1,49 @@
+"""description hash uniqueness
+
+Revision ID: 8b3f6d1e2a57
+Revises: 5d2a8f4c7e19
+Create Date: 2026-02-09 14:05:52.613087
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3f6d1e2a57'
+down_revision: Union[str, Sequence[str], None] = '5d2a8f4c7e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# convert_to() is only STABLE, a generated column needs an IMMUTABLE expression. The database
+# encoding is fixed at creation, so declaring the wrapper immutable is safe.
+DIGEST_FUNCTION = """
+CREATE FUNCTION task_description_digest(description text) RETURNS bytea
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT sha256(convert_to(description, 'UTF8'))
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(DIGEST_FUNCTION)
+    op.add_column('tasks', sa.Column('description_hash', sa.LargeBinary(),
+                                     sa.Computed("task_description_digest(description)", persisted=True),
+                                     nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_description_hash', 'tasks', ['description_hash'], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+    op.drop_constraint('tasks_description_key', 'tasks', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint('tasks_description_key', 'tasks', ['description'])
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_description_hash', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('tasks', 'description_hash')
+    op.execute("DROP FUNCTION IF EXISTS task_description_digest(text)")
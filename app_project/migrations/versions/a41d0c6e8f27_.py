@@ -0,0 +1,30 @@
+"""keyset pagination indexes
+
+Revision ID: a41d0c6e8f27
+Revises: 3c7e1f9a2b48
+Create Date: 2026-01-20 11:37:52.104386
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d0c6e8f27'
+down_revision: Union[str, Sequence[str], None] = '3c7e1f9a2b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_created_at_id', 'tasks', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_priority_id', 'tasks', ['priority', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_priority_id', table_name='tasks')
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
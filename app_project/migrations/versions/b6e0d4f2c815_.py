@@ -0,0 +1,54 @@
+"""offload large task results
+
+Revision ID: b6e0d4f2c815
+Revises: 7f1c3a5e9b24
+Create Date: 2026-03-16 11:04:27.531904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e0d4f2c815'
+down_revision: Union[str, Sequence[str], None] = '7f1c3a5e9b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RESULT_DELETE_FUNCTION = """
+CREATE FUNCTION task_result_on_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM task_results AS r USING old_rows AS o WHERE r.task_id = o.id;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE tasks ALTER COLUMN result TYPE jsonb USING result::jsonb")
+    op.add_column("tasks", sa.Column("result_external", sa.Boolean(), server_default=sa.text("false"),
+                                     nullable=False))
+    op.create_table(
+        "task_results",
+        sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("task_id"),
+    )
+    op.execute(RESULT_DELETE_FUNCTION)
+    op.execute("CREATE TRIGGER task_result_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+               "FOR EACH STATEMENT EXECUTE FUNCTION task_result_on_delete()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS task_result_delete ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_result_on_delete()")
+    op.drop_table("task_results")
+    op.drop_column("tasks", "result_external")
+    op.execute("ALTER TABLE tasks ALTER COLUMN result TYPE json USING result::json")
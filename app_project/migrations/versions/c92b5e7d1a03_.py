@@ -0,0 +1,35 @@
+"""status indexes
+
+Revision ID: c92b5e7d1a03
+Revises: a41d0c6e8f27
+Create Date: 2026-01-26 16:12:08.771245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c92b5e7d1a03'
+down_revision: Union[str, Sequence[str], None] = 'a41d0c6e8f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_status_id', 'tasks', ['status', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_new_id', 'tasks', ['id'], unique=False,
+                        postgresql_where=sa.text("status = 'NEW'"),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_new_id', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_status_id', table_name='tasks', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,157 @@
+"""task stats rollup
+
+Revision ID: e4b7c2a9d316
+Revises: 6c2e9a4b1d73
+Create Date: 2026-02-23 10:38:14.902761
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c2a9d316'
+down_revision: Union[str, Sequence[str], None] = '6c2e9a4b1d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LATENCY_BUCKET_FUNCTION = """
+CREATE FUNCTION task_latency_bucket(elapsed interval) RETURNS smallint
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT floor(log(2.0, greatest(extract(epoch FROM elapsed) * 1000, 1)::numeric))::smallint
+$$
+"""
+
+# Counter rows are spread over slots so concurrent statements rarely update the same row
+COUNTS_DELTA_SQL = """
+    INSERT INTO task_status_counts (status, priority, slot, count)
+    SELECT status, priority, floor(random() * 16)::smallint, sum(delta)
+    FROM ({rows}) AS d
+    GROUP BY status, priority
+    HAVING sum(delta) <> 0
+    ON CONFLICT (status, priority, slot) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+"""
+
+INSERT_TRIGGER_FUNCTION = """
+CREATE FUNCTION task_stats_on_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+""" + COUNTS_DELTA_SQL.format(rows="SELECT status, priority, 1 AS delta FROM new_rows") + """
+    RETURN NULL;
+END
+$$
+"""
+
+DELETE_TRIGGER_FUNCTION = """
+CREATE FUNCTION task_stats_on_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+""" + COUNTS_DELTA_SQL.format(rows="SELECT status, priority, -1 AS delta FROM old_rows") + """
+    RETURN NULL;
+END
+$$
+"""
+
+UPDATE_TRIGGER_FUNCTION = """
+CREATE FUNCTION task_stats_on_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+""" + COUNTS_DELTA_SQL.format(rows="""
+        SELECT o.status, o.priority, -1 AS delta
+        FROM old_rows AS o JOIN new_rows AS n ON n.id = o.id
+        WHERE (o.status, o.priority) IS DISTINCT FROM (n.status, n.priority)
+        UNION ALL
+        SELECT n.status, n.priority, 1 AS delta
+        FROM old_rows AS o JOIN new_rows AS n ON n.id = o.id
+        WHERE (o.status, o.priority) IS DISTINCT FROM (n.status, n.priority)
+    """) + """
+    INSERT INTO task_latency_buckets (minute, kind, bucket, count)
+    SELECT minute, kind, bucket, count(*)
+    FROM (
+        SELECT date_trunc('minute', n.started_at) AS minute, 'wait' AS kind,
+               task_latency_bucket(n.started_at - (n.created_at AT TIME ZONE 'UTC')) AS bucket
+        FROM old_rows AS o JOIN new_rows AS n ON n.id = o.id
+        WHERE n.started_at IS NOT NULL AND n.started_at IS DISTINCT FROM o.started_at
+        UNION ALL
+        SELECT date_trunc('minute', n.completed_at), 'run', task_latency_bucket(n.completed_at - n.started_at)
+        FROM old_rows AS o JOIN new_rows AS n ON n.id = o.id
+        WHERE n.completed_at IS NOT NULL AND n.started_at IS NOT NULL
+          AND n.completed_at IS DISTINCT FROM o.completed_at
+    ) AS l
+    GROUP BY minute, kind, bucket
+    ON CONFLICT (minute, kind, bucket) DO UPDATE SET count = task_latency_buckets.count + EXCLUDED.count;
+
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = [
+    "CREATE TRIGGER task_stats_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_on_insert()",
+    "CREATE TRIGGER task_stats_update AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_on_update()",
+    "CREATE TRIGGER task_stats_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_on_delete()",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_status_counts',
+                    sa.Column('status', postgresql.ENUM(name='status', create_type=False), nullable=False),
+                    sa.Column('priority', postgresql.ENUM(name='priority', create_type=False), nullable=False),
+                    sa.Column('slot', sa.SmallInteger(), nullable=False),
+                    sa.Column('count', sa.BigInteger(), nullable=False),
+                    sa.PrimaryKeyConstraint('status', 'priority', 'slot'))
+    op.create_table('task_latency_buckets',
+                    sa.Column('minute', sa.TIMESTAMP(timezone=True), nullable=False),
+                    sa.Column('kind', sa.String(length=8), nullable=False),
+                    sa.Column('bucket', sa.SmallInteger(), nullable=False),
+                    sa.Column('count', sa.BigInteger(), nullable=False),
+                    sa.PrimaryKeyConstraint('minute', 'kind', 'bucket'))
+
+    op.execute(LATENCY_BUCKET_FUNCTION)
+    op.execute(INSERT_TRIGGER_FUNCTION)
+    op.execute(UPDATE_TRIGGER_FUNCTION)
+    op.execute(DELETE_TRIGGER_FUNCTION)
+
+    # Writers wait until the triggers exist, so the backfill and the triggers see the same rows
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+
+    op.execute("""
+        INSERT INTO task_status_counts (status, priority, slot, count)
+        SELECT status, priority, 0, count(*) FROM tasks GROUP BY status, priority
+    """)
+    op.execute("""
+        INSERT INTO task_latency_buckets (minute, kind, bucket, count)
+        SELECT minute, kind, bucket, count(*)
+        FROM (
+            SELECT date_trunc('minute', started_at) AS minute, 'wait' AS kind,
+                   task_latency_bucket(started_at - (created_at AT TIME ZONE 'UTC')) AS bucket
+            FROM tasks WHERE started_at IS NOT NULL
+            UNION ALL
+            SELECT date_trunc('minute', completed_at), 'run', task_latency_bucket(completed_at - started_at)
+            FROM tasks WHERE completed_at IS NOT NULL AND started_at IS NOT NULL
+        ) AS l
+        GROUP BY minute, kind, bucket
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS task_stats_delete ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS task_stats_update ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS task_stats_insert ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_stats_on_delete()")
+    op.execute("DROP FUNCTION IF EXISTS task_stats_on_update()")
+    op.execute("DROP FUNCTION IF EXISTS task_stats_on_insert()")
+    op.execute("DROP FUNCTION IF EXISTS task_latency_bucket(interval)")
+    op.drop_table('task_latency_buckets')
+    op.drop_table('task_status_counts')
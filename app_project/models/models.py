@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import TIMESTAMP, JSON, TEXT, String, Enum, func
+from sqlalchemy import (TIMESTAMP, TEXT, BigInteger, Integer, LargeBinary, PrimaryKeyConstraint,
+                        SmallInteger, String, Enum, Index, func, text)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app_project.database import Base
@@ -17,6 +19,22 @@ class Status(str, PyEnum):
     CANCELLED = "cancelled"
 
 
+ALLOWED_TRANSITIONS: dict[Status, tuple[Status, ...]] = {
+    Status.NEW: (Status.FAILED,),
+    Status.PENDING: (Status.NEW, Status.IN_PROGRESS),
+    Status.IN_PROGRESS: (Status.PENDING,),
+    Status.COMPLETED: (Status.IN_PROGRESS,),
+    Status.FAILED: (Status.PENDING, Status.IN_PROGRESS),
+    Status.CANCELLED: (Status.NEW, Status.PENDING, Status.IN_PROGRESS),
+}
+
+# FAILED is terminal for a run but can be requeued, only these never change again
+FINAL_STATUSES = frozenset({Status.COMPLETED, Status.CANCELLED})
+
+# LISTEN/NOTIFY channel of the task_status_notify triggers, shared by the migration and StatusListener
+TASK_STATUS_CHANNEL = "task_status"
+
+
 class Priority(str, PyEnum):
     LOW = "low"
     MEDIUM = "medium"
@@ -24,15 +42,68 @@ class Priority(str, PyEnum):
 
 
 class Tasks(Base):
+    """Партиционирована по created_at помесячно, уникальность описаний обеспечивает task_digests"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at", name="tasks_pkey"),
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_priority_id", "priority", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_new_id", "id", postgresql_where=text("status = 'NEW'")),
+        Index("ix_tasks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_tasks_started_at", "started_at"),
+        Index("ix_tasks_completed_at", "completed_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(autoincrement=True)
     title: Mapped[str] = mapped_column(String(50), nullable=False)
-    description: Mapped[str] = mapped_column(TEXT, nullable=False, unique=True)
+    description: Mapped[str] = mapped_column(TEXT, nullable=False)
     priority: Mapped[Priority] = mapped_column(Enum(Priority), default=Priority.LOW)
     status: Mapped[Status] = mapped_column(Enum(Status), default=Status.PENDING)
     created_at: Mapped[datetime] = mapped_column(server_default=func.timezone('utc', func.now()), nullable=False)
     started_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None, nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None, nullable=True)
-    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    result_external: Mapped[bool] = mapped_column(default=False, server_default=text("false"), nullable=False)
     errors: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+
+    # The table key includes the partition column, rows are still identified by id alone
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class TaskDigest(Base):
+    """SHA-256 описаний задач, глобальная уникальность для партиционированной tasks"""
+    __tablename__ = "task_digests"
+
+    description_hash: Mapped[bytes] = mapped_column(LargeBinary, primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+
+class TaskResult(Base):
+    """Результаты больше RESULT_INLINE_LIMIT, сжатые zstd; у задачи при этом result_external и пустой result"""
+    __tablename__ = "task_results"
+
+    task_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class TaskStatusCount(Base):
+    """Счетчики задач по статусу и приоритету, ведутся триггерами на tasks"""
+    __tablename__ = "task_status_counts"
+
+    status: Mapped[Status] = mapped_column(Enum(Status), primary_key=True)
+    priority: Mapped[Priority] = mapped_column(Enum(Priority), primary_key=True)
+    slot: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class TaskLatencyBucket(Base):
+    """Поминутные гистограммы ожидания (wait) и выполнения (run), бакет b - от 2^b до 2^(b+1) мс"""
+    __tablename__ = "task_latency_buckets"
+
+    minute: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -1,11 +1,12 @@
 import asyncio
-import pika
 import json
 import logging
 
-from app_project.models.models import Status
+from aio_pika import connect_robust, DeliveryMode, Message
+
 from app_project.database import session_context
 from app_project.rabbit_config import mq_settings
+from app_project.rabbit_topology import declare_cancel_exchange, declare_topology
 from app_project.producer.producer_repository import ProducerRepository
 
 logger = logging.getLogger(__name__)
@@ -15,110 +16,127 @@ class RabbitMQProducer:
     def __init__(self):
         self.connection = None
         self.channel = None
-        self.queue_name = mq_settings.RABBITMQ_QUEUE
+        self.exchange = None
+        self.cancel_exchange = None
 
-    def connect(self):
-        credentials = pika.PlainCredentials(
-            mq_settings.RABBITMQ_USER,
-            mq_settings.RABBITMQ_PASSWORD
-        )
-        parameters = pika.ConnectionParameters(
+    async def connect(self):
+        self.connection = await connect_robust(
             host=mq_settings.RABBITMQ_HOST,
             port=mq_settings.RABBITMQ_PORT,
-            credentials=credentials,
-            heartbeat=600,
-            blocked_connection_timeout=300
+            login=mq_settings.RABBITMQ_USER,
+            password=mq_settings.RABBITMQ_PASSWORD,
+            virtualhost="/"
         )
 
-        self.connection = pika.BlockingConnection(parameters)
+        self.channel = await self.connection.channel(publisher_confirms=True, on_return_raises=True)
 
-        self.channel = self.connection.channel()
+        self.exchange = await declare_topology(self.channel)
+        self.cancel_exchange = await declare_cancel_exchange(self.channel)
 
-        self.channel.exchange_declare(
-            exchange=mq_settings.RABBITMQ_EXCHANGE,
-            exchange_type='direct',
-            durable=True
-        )
+    async def publish_message(self, message: dict) -> bool:
+        try:
+            await self.exchange.publish(
+                Message(json.dumps(message).encode(), delivery_mode=DeliveryMode.PERSISTENT),
+                routing_key=mq_settings.queue_for(message["priority"])
+            )
+
+            return True
+        except Exception as e:
+            logger.error(f"Message {message.get('id')} not confirmed: {e}")
+            return False
 
-        self.channel.queue_declare(queue=self.queue_name, durable=True)
+    async def publish_batch(self, messages: list[dict]) -> list[int]:
+        window = asyncio.Semaphore(mq_settings.PRODUCER_CONFIRM_WINDOW)
 
-        self.channel.queue_bind(
-            exchange=mq_settings.RABBITMQ_EXCHANGE,
-            queue=self.queue_name,
-            routing_key=self.queue_name
-        )
+        async def publish(message: dict) -> bool:
+            async with window:
+                return await self.publish_message(message)
 
-    def publish_message(self, message: dict):
-        if not self.connection or self.connection.is_closed:
-            self.connect()
+        confirmed = await asyncio.gather(*(publish(message) for message in messages))
+        return [message["id"] for message, ok in zip(messages, confirmed) if ok]
 
-        try:
-            self.channel.basic_publish(
-                exchange=mq_settings.RABBITMQ_EXCHANGE,
-                routing_key=self.queue_name,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(delivery_mode=2)
+    async def broadcast_cancel(self, task_ids: list[int]):
+        # A filter selection can cancel many thousands of tasks, keep each message small
+        for start in range(0, len(task_ids), mq_settings.CANCEL_BROADCAST_BATCH_SIZE):
+            chunk = task_ids[start:start + mq_settings.CANCEL_BROADCAST_BATCH_SIZE]
+            await self.cancel_exchange.publish(
+                Message(json.dumps({"ids": chunk}).encode()),
+                routing_key=""
             )
 
-            return True
+    async def close(self):
+        if self.connection and not self.connection.is_closed:
+            await self.connection.close()
+
+
+async def publish_new_tasks(producer: RabbitMQProducer, repo: ProducerRepository,
+                            task_ids: list[int] | None = None) -> list[int]:
+    limit = len(task_ids) if task_ids is not None else mq_settings.PRODUCER_BATCH_SIZE
+
+    async with session_context() as session:
+        try:
+            tasks = await repo.claim_new_tasks(session, limit, task_ids)
+
+            messages = [
+                {
+                    "id": task.id,
+                    "title": task.title,
+                    "description": task.description,
+                    "priority": task.priority,
+                    "status": task.status,
+                }
+                for task in tasks
+            ]
+
+            confirmed_ids = await producer.publish_batch(messages)
+
+            if confirmed_ids:
+                await repo.update_status_to_pending(session, confirmed_ids)
+            else:
+                await session.rollback()
+
+            return confirmed_ids
+
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
-            self.reconnect()
-            return False
+            await session.rollback()
+            return []
 
-    def reconnect(self):
-        if self.connection:
-            self.connection.close()
-        self.connect()
 
-    def close(self):
-        if self.connection and not self.connection.is_closed:
-            self.connection.close()
+class TaskPublisher:
+    """Публикует задачи сразу после создания через API, не дожидаясь цикла producer_worker"""
+
+    def __init__(self, producer: RabbitMQProducer, repo: ProducerRepository | None = None):
+        self.producer = producer
+        self.repo = repo or ProducerRepository()
+
+    async def publish(self, task_ids: list[int]) -> set[int]:
+        """Возвращает ID, подтвержденные брокером и переведенные в PENDING"""
+        published = set()
+        for start in range(0, len(task_ids), mq_settings.PRODUCER_BATCH_SIZE):
+            chunk = task_ids[start:start + mq_settings.PRODUCER_BATCH_SIZE]
+            published.update(await publish_new_tasks(self.producer, self.repo, chunk))
+        return published
 
 
 async def producer_worker():
     producer = RabbitMQProducer()
-    producer.connect()
+    await producer.connect()
     repo = ProducerRepository()
 
     try:
         while True:
-            async with session_context() as session:
-                try:
-                    tasks = await repo.get_new_tasks(session)
-
-                    if tasks:
-                        task_ids = []
-                        for task in tasks:
-                            if task.status == Status.CANCELLED:
-                                continue
-
-                            message = {
-                                "id": task.id,
-                                "title": task.title,
-                                "description": task.description,
-                                "priority": task.priority,
-                                "status": task.status,
-                            }
-
-                            if producer.publish_message(message):
-                                task_ids.append(task.id)
-
-                        if task_ids:
-                            await repo.update_status_to_pending(session, task_ids)
-
-                except Exception as e:
-                    logger.error(f"Unexpected error: {e}")
-                    await session.rollback()
+            published = len(await publish_new_tasks(producer, repo))
 
-            await asyncio.sleep(mq_settings.PRODUCER_INTERVAL)
+            if published < mq_settings.PRODUCER_BATCH_SIZE:
+                await asyncio.sleep(mq_settings.PRODUCER_INTERVAL)
 
     except KeyboardInterrupt:
         logger.info("Producer stopped")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
-        producer.close()
+        await producer.close()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,29 @@
+from typing import Sequence
+
 from sqlalchemy import select, update
 
 from app_project.models.models import Tasks, Status
 
 
 class ProducerRepository:
-    async def get_new_tasks(self, session) -> list:
-        stmt = select(Tasks).where(Tasks.status == Status.NEW)
+    async def claim_new_tasks(self, session, limit: int, task_ids: list | None = None) -> Sequence[Tasks]:
+        stmt = (
+            select(Tasks)
+            .where(Tasks.status == Status.NEW)
+            .order_by(Tasks.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        if task_ids is not None:
+            stmt = stmt.where(Tasks.id.in_(task_ids))
         result = await session.execute(stmt)
         return result.scalars().all()
 
     async def update_status_to_pending(self, session, task_ids: list):
         update_stmt = (
             update(Tasks)
-            .where(Tasks.id.in_(task_ids))
+            .where(Tasks.id.in_(task_ids), Tasks.status == Status.NEW)
             .values(status=Status.PENDING)
         )
 
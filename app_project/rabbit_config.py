@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app_project.models.models import Priority
+
 
 class RabbitSettings(BaseSettings):
     RABBITMQ_USER: str
@@ -10,6 +12,36 @@ class RabbitSettings(BaseSettings):
     RABBITMQ_EXCHANGE: str
 
     PRODUCER_INTERVAL:int
+    PRODUCER_BATCH_SIZE: int = 500
+    PRODUCER_CONFIRM_WINDOW: int = 100
+    CANCEL_BROADCAST_BATCH_SIZE: int = 1000
+
+    PUBLISH_ON_CREATE: bool = False
+
+    CONSUMER_CONCURRENCY: int = 10
+    CONSUMER_THREAD_WORKERS: int | None = None
+    CONSUMER_PROCESS_WORKERS: int | None = None
+    CONSUMER_STATUS_FLUSH_INTERVAL: float = 0.05
+    CONSUMER_STATUS_BATCH_SIZE: int = 500
+
+    CONSUMER_MAX_ATTEMPTS: int = 5
+    CONSUMER_RETRY_BASE_DELAY: float = 1.0
+    CONSUMER_RETRY_MAX_DELAY: float = 300.0
+    CONSUMER_QUEUE_WEIGHTS: dict[Priority, int] = {Priority.HIGH: 6, Priority.MEDIUM: 3, Priority.LOW: 1}
+
+    def queue_for(self, priority: Priority | str) -> str:
+        return f"{self.RABBITMQ_QUEUE}.{Priority(priority).value}"
+
+    def delay_queue_for(self, priority: Priority | str, attempt: int) -> str:
+        return f"{self.queue_for(priority)}.delay.{attempt}"
+
+    @property
+    def DEAD_LETTER_QUEUE(self) -> str:
+        return f"{self.RABBITMQ_QUEUE}.dlq"
+
+    @property
+    def CANCEL_EXCHANGE(self) -> str:
+        return f"{self.RABBITMQ_EXCHANGE}.cancel"
 
     @property
     def RABBIT_URL(self) -> str:
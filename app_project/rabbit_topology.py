@@ -0,0 +1,47 @@
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractQueue
+
+from app_project.models.models import Priority
+from app_project.rabbit_config import mq_settings
+
+
+async def declare_task_queue(channel: AbstractChannel, priority: Priority) -> AbstractQueue:
+    return await channel.declare_queue(
+        mq_settings.queue_for(priority),
+        durable=True,
+        arguments={
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": mq_settings.DEAD_LETTER_QUEUE,
+        }
+    )
+
+
+async def declare_cancel_exchange(channel: AbstractChannel) -> AbstractExchange:
+    return await channel.declare_exchange(mq_settings.CANCEL_EXCHANGE, ExchangeType.FANOUT, durable=True)
+
+
+async def declare_topology(channel: AbstractChannel) -> AbstractExchange:
+    exchange = await channel.declare_exchange(
+        mq_settings.RABBITMQ_EXCHANGE,
+        ExchangeType.DIRECT,
+        durable=True
+    )
+
+    await channel.declare_queue(mq_settings.DEAD_LETTER_QUEUE, durable=True)
+    await declare_cancel_exchange(channel)
+
+    for priority in Priority:
+        queue = await declare_task_queue(channel, priority)
+        await queue.bind(exchange, routing_key=queue.name)
+
+        for attempt in range(1, mq_settings.CONSUMER_MAX_ATTEMPTS):
+            await channel.declare_queue(
+                mq_settings.delay_queue_for(priority, attempt),
+                durable=True,
+                arguments={
+                    "x-dead-letter-exchange": mq_settings.RABBITMQ_EXCHANGE,
+                    "x-dead-letter-routing-key": queue.name,
+                }
+            )
+
+    return exchange
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app_project.exceptions import DatabaseError
+from app_project.models.models import Priority, Status, TaskLatencyBucket, TaskStatusCount
+
+
+class StatsRepository:
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_counts(self) -> dict[tuple[Status, Priority], int]:
+        try:
+            total = func.sum(TaskStatusCount.count)
+            stmt = (select(TaskStatusCount.status, TaskStatusCount.priority, total.label("count"))
+                    .group_by(TaskStatusCount.status, TaskStatusCount.priority)
+                    .having(total != 0)
+                    )
+            result = await self.session.execute(stmt)
+            return {(row.status, row.priority): int(row.count) for row in result}
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Не удалось получить счетчики задач: {str(e)}")
+
+    async def get_latency_buckets(self, since: datetime) -> dict[str, dict[int, int]]:
+        try:
+            stmt = (select(TaskLatencyBucket.kind, TaskLatencyBucket.bucket,
+                           func.sum(TaskLatencyBucket.count).label("count"))
+                    .where(TaskLatencyBucket.minute >= since)
+                    .group_by(TaskLatencyBucket.kind, TaskLatencyBucket.bucket)
+                    )
+            result = await self.session.execute(stmt)
+
+            buckets = {}
+            for row in result:
+                buckets.setdefault(row.kind, {})[row.bucket] = int(row.count)
+            return buckets
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Не удалось получить гистограммы задержек: {str(e)}")
+
+    async def prune_latency_buckets(self, before: datetime) -> int:
+        try:
+            result = await self.session.execute(delete(TaskLatencyBucket).where(TaskLatencyBucket.minute < before))
+            await self.session.commit()
+            return result.rowcount
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise DatabaseError(f"Не удалось удалить старые гистограммы задержек: {str(e)}")
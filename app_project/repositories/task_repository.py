@@ -1,12 +1,44 @@
-from typing import Sequence
+from datetime import datetime, timezone
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select, delete
+from sqlalchemy import ARRAY, Integer, any_, select, delete, update, literal, null, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app_project.exceptions import AlreadyExistsError, DatabaseError, NotFoundError
-from app_project.models.models import Tasks, Status
-from app_project.schemas.task_schema import TaskCreateSchema, TaskFilter
+from app_project.models.models import ALLOWED_TRANSITIONS, TaskResult, Tasks, Status
+from app_project.schemas.task_schema import SortOrder, TaskCreateSchema, TaskFilter, TaskSort
+
+
+INSERT_CHUNK_SIZE = 5000
+EXPORT_CHUNK_SIZE = 1000
+
+SORT_KEYS = {
+    TaskSort.ID: (Tasks.id,),
+    TaskSort.CREATED_AT: (Tasks.created_at, Tasks.id),
+    TaskSort.PRIORITY: (Tasks.priority, Tasks.id),
+}
+
+RANGE_FILTERS = {
+    "created_after": (Tasks.created_at, True),
+    "created_before": (Tasks.created_at, False),
+    "started_after": (Tasks.started_at, True),
+    "started_before": (Tasks.started_at, False),
+    "completed_after": (Tasks.completed_at, True),
+    "completed_before": (Tasks.completed_at, False),
+}
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def to_column_time(column, value: datetime) -> datetime:
+    # created_at хранится без часового пояса (UTC), asyncpg не принимает aware datetime для такого столбца
+    if not column.type.timezone and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class TaskRepository:
@@ -30,41 +62,111 @@ class TaskRepository:
             await self.session.rollback()
             raise DatabaseError(f"Не удалось создать задачу: {str(e)}")
 
-    async def filtres_list_paginate(self, filters: TaskFilter, limit: int = 10,
-                                    cursor_id: int | None = None) -> Sequence[Tasks]:
+    async def create_many(self, tasks: list[TaskCreateSchema]) -> list[int | None]:
+        try:
+            ids_by_description = {}
+            rows = [task.model_dump() for task in tasks]
+
+            # The digest trigger on tasks skips duplicate descriptions instead of failing the statement
+            await self.session.execute(text("SET LOCAL app.skip_duplicate_tasks = 'on'"))
+
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                stmt = (insert(Tasks)
+                        .values(rows[start:start + INSERT_CHUNK_SIZE])
+                        .on_conflict_do_nothing()
+                        .returning(Tasks.id, Tasks.description)
+                        )
+                result = await self.session.execute(stmt)
+                ids_by_description.update({row.description: row.id for row in result})
+
+            await self.session.commit()
+
+            # A description repeated inside the batch is created once, later copies are duplicates
+            return [ids_by_description.pop(row["description"], None) for row in rows]
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise DatabaseError(f"Не удалось создать задачи: {str(e)}")
+
+    async def filtres_list_paginate(self, filters: TaskFilter, limit: int = 10, sort: TaskSort = TaskSort.ID,
+                                    order: SortOrder = SortOrder.ASC, after: tuple | None = None,
+                                    columns: tuple[str, ...] | None = None) -> Sequence:
         try:
             data = filters.model_dump(exclude_none=True)
 
             conditions = self._build_filters(Tasks, data)
 
-            if cursor_id is not None:
-                conditions.append(Tasks.id > cursor_id)
+            keys = SORT_KEYS[sort]
+            if after is not None:
+                position = tuple_(*(literal(value, key.type) for key, value in zip(keys, after)))
+                conditions.append(tuple_(*keys) > position if order == SortOrder.ASC else tuple_(*keys) < position)
 
-            stmt = (select(Tasks)
+            stmt = (select(*self._entities(columns))
                     .where(*conditions)
+                    .order_by(*(key.asc() if order == SortOrder.ASC else key.desc() for key in keys))
                     .limit(limit)
                     )
 
-            result = await self.session.scalars(stmt)
-            return result.all()
+            result = await self.session.execute(stmt)
+            return result.all() if columns else result.scalars().all()
 
         except SQLAlchemyError as e:
             raise DatabaseError(f"Не удалось получить список задач: {str(e)}")
 
+    async def stream_filtered(self, filters: TaskFilter) -> AsyncIterator[Sequence[Tasks]]:
+        data = filters.model_dump(exclude_none=True)
+        conditions = self._build_filters(Tasks, data)
+
+        stmt = (select(Tasks)
+                .where(*conditions)
+                .order_by(Tasks.id)
+                .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+                )
+
+        try:
+            result = await self.session.stream_scalars(stmt)
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Не удалось выгрузить задачи: {str(e)}")
+
+        async for partition in result.partitions():
+            yield partition
+
     @staticmethod
     def _build_filters(model, filter_data: dict) -> list:
         conditions = []
 
         for field, value in filter_data.items():
-            if value is not None:
+            if value is None:
+                continue
+
+            if field == "title":
+                conditions.append(model.title.ilike(f"%{escape_like(value)}%", escape="\\"))
+            elif field in RANGE_FILTERS:
+                column, lower = RANGE_FILTERS[field]
+                value = to_column_time(column, value)
+                conditions.append(column >= value if lower else column < value)
+            else:
                 column = getattr(model, field, None)
                 if column is not None:
                     conditions.append(column == value)
         return conditions
 
-    async def get_by_id(self, task_id: int) -> Tasks | None:
+    @staticmethod
+    def _id_in(task_ids: list[int]):
+        # One array parameter instead of a bind parameter per id
+        return Tasks.id == any_(literal(task_ids, ARRAY(Integer)))
+
+    @staticmethod
+    def _entities(columns: tuple[str, ...] | None) -> list:
+        return [getattr(Tasks, column) for column in columns] if columns else [Tasks]
+
+    async def get_by_id(self, task_id: int, columns: tuple[str, ...] | None = None):
         try:
-            task = await self.session.get(Tasks, task_id)
+            if columns:
+                result = await self.session.execute(select(*self._entities(columns)).where(Tasks.id == task_id))
+                task = result.first()
+            else:
+                task = await self.session.get(Tasks, task_id)
             if not task:
                 raise NotFoundError(object_id=task_id)
             return task
@@ -72,20 +174,90 @@ class TaskRepository:
         except SQLAlchemyError as e:
             raise DatabaseError(f"Не удалось получить задачу {task_id}: {str(e)}")
 
-    async def delete_by_id(self, task_id: int) -> int | None:
+    async def get_result_blob(self, task_id: int) -> bytes | None:
         try:
-            task = await self.get_by_id(task_id)
+            return await self.session.scalar(select(TaskResult.data).where(TaskResult.task_id == task_id))
 
-            stmt = delete(Tasks).where(Tasks.id == task_id)
-            result = await self.session.execute(stmt)
-            await self.session.commit()
-            return True
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Не удалось получить результат задачи {task_id}: {str(e)}")
+
+    async def delete_by_id(self, task_id: int) -> bool:
+        return bool(await self.delete_many(ids=[task_id]))
+
+    async def delete_many(self, ids: list[int] | None = None, filters: TaskFilter | None = None) -> list[int]:
+        stmt = delete(Tasks).where(*self._selection(ids, filters), Tasks.status != Status.COMPLETED)
+        return await self._apply_bulk(stmt, "Не удалось удалить задачи")
+
+    async def cancel_by_id(self, task_id: int) -> bool:
+        return bool(await self.cancel_many(ids=[task_id]))
+
+    async def cancel_many(self, ids: list[int] | None = None,
+                          filters: TaskFilter | None = None) -> dict[int, Status]:
+        """Отмененные задачи и их статусы до отмены"""
+        # The previous status tells which tasks may already be on a consumer
+        before = (select(Tasks.id, Tasks.status)
+                  .where(*self._selection(ids, filters), Tasks.status.in_(ALLOWED_TRANSITIONS[Status.CANCELLED]))
+                  .with_for_update()
+                  .cte("before"))
+        stmt = (update(Tasks)
+                .where(Tasks.id == before.c.id)
+                .values(status=Status.CANCELLED)
+                .returning(Tasks.id, before.c.status)
+                )
+        rows = await self._execute_bulk(stmt, "Не удалось отменить задачи")
+        return {row.id: row.status for row in rows}
+
+    async def requeue_failed(self, ids: list[int] | None = None, filters: TaskFilter | None = None) -> list[int]:
+        stmt = (update(Tasks)
+                .where(*self._selection(ids, filters), Tasks.status.in_(ALLOWED_TRANSITIONS[Status.NEW]))
+                .values(status=Status.NEW, attempts=0, started_at=None, completed_at=None, result=null(),
+                        result_external=False, errors=None)
+                )
+        return await self._apply_bulk(stmt, "Не удалось вернуть задачи в очередь", drop_results=True)
+
+    def _selection(self, ids: list[int] | None, filters: TaskFilter | None) -> list:
+        if ids is not None:
+            return [self._id_in(ids)]
+        return self._build_filters(Tasks, filters.model_dump(exclude_none=True))
 
+    async def _apply_bulk(self, stmt, error_message: str, drop_results: bool = False) -> list[int]:
+        # Status notifications for the API listeners are sent by the task_status_notify triggers
+        query = stmt.returning(Tasks.id)
+        if drop_results:
+            # Offloaded results of the changed rows go in the same statement
+            changed = query.cte("changed")
+            dropped = delete(TaskResult).where(TaskResult.task_id.in_(select(changed.c.id))).cte("dropped_results")
+            query = select(changed.c.id).add_cte(dropped)
+
+        return [row.id for row in await self._execute_bulk(query, error_message)]
+
+    async def _execute_bulk(self, query, error_message: str) -> list:
+        try:
+            rows = (await self.session.execute(query)).all()
+            await self.session.commit()
+            return rows
 
         except SQLAlchemyError as e:
             await self.session.rollback()
-            raise DatabaseError(f"Не удалось удалить задачу {task_id}: {str(e)}")
+            raise DatabaseError(f"{error_message}: {str(e)}")
 
     async def get_status_by_id(self, task_id: int) -> Status | None:
-        task = await self.get_by_id(task_id)
-        return task.status
+        try:
+            status = await self.session.scalar(select(Tasks.status).where(Tasks.id == task_id))
+            if status is None:
+                raise NotFoundError(object_id=task_id)
+            return status
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Не удалось получить статус задачи {task_id}: {str(e)}")
+
+    async def get_statuses_by_ids(self, task_ids: list[int]) -> dict[int, Status]:
+        try:
+            result = await self.session.execute(select(Tasks.id, Tasks.status).where(self._id_in(task_ids)))
+            return {row.id: row.status for row in result}
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Не удалось получить статусы задач: {str(e)}")
+
+    async def release(self) -> None:
+        await self.session.close()
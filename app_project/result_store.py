@@ -0,0 +1,24 @@
+import json
+
+import zstandard
+
+from app_project.config import settings
+
+_compressor = zstandard.ZstdCompressor(level=settings.RESULT_COMPRESSION_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def encode_result(result: dict | None) -> tuple[str | None, bytes | None]:
+    """JSON результата для колонки tasks.result или сжатый zstd блоб для task_results, если он больше лимита"""
+    if result is None:
+        return None, None
+
+    raw = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+    encoded = raw.encode()
+    if len(encoded) <= settings.RESULT_INLINE_LIMIT:
+        return raw, None
+    return None, _compressor.compress(encoded)
+
+
+def decode_result(blob: bytes) -> dict:
+    return json.loads(_decompressor.decompress(blob))
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app_project.models.models import Priority, Status
+
+
+class TaskCountItem(BaseModel):
+    """Количество задач с данным статусом и приоритетом"""
+
+    status: Status
+    priority: Priority
+    count: int = Field(examples=[42])
+
+
+class LatencyStats(BaseModel):
+    """Перцентили задержки в миллисекундах, посчитанные по бакетам гистограммы"""
+
+    count: int = Field(examples=[1000], description="Количество замеров в окне")
+    p50: Optional[float] = Field(default=None, examples=[120.5])
+    p90: Optional[float] = Field(default=None, examples=[850.0])
+    p99: Optional[float] = Field(default=None, examples=[4100.0])
+
+
+class TaskStatsResponse(BaseModel):
+    """Схема ответа статистики задач"""
+
+    total: int = Field(examples=[1500], description="Всего задач")
+    by_status: dict[Status, int] = Field(description="Количество задач по статусам")
+    by_priority: dict[Priority, int] = Field(description="Количество задач по приоритетам")
+    counts: list[TaskCountItem] = Field(description="Количество задач по статусу и приоритету")
+    window_minutes: int = Field(examples=[60], description="Окно для гистограмм задержек, минут")
+    wait: LatencyStats = Field(description="Ожидание: started_at - created_at")
+    run: LatencyStats = Field(description="Выполнение: completed_at - started_at")
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from functools import lru_cache
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, create_model, model_validator
 
 from app_project.models.models import Priority, Status
 
@@ -66,10 +68,73 @@ class TaskReadSchema(TaskCreateSchema, BaseModel):
                                       "format": "text"
                                   }
                                   )
+    attempts: int = Field(default=0, examples=[1], description="Количество попыток выполнения",
+                          json_schema_extra={
+                              "x-order": 10,
+                              "readOnly": True
+                          })
+    result_external: bool = Field(default=False, examples=[False],
+                                  description="Результат хранится отдельно и отдается только при запросе задачи по ID",
+                                  json_schema_extra={
+                                      "x-order": 11,
+                                      "readOnly": True
+                                  })
 
     model_config = ConfigDict(from_attributes=True)
 
 
+TASK_FIELDS = tuple(TaskReadSchema.model_fields)
+LIST_DEFAULT_FIELDS = tuple(field for field in TASK_FIELDS if field not in ("result", "errors"))
+
+
+def _task_fields(fields: tuple[str, ...]) -> dict:
+    return {field: (TaskReadSchema.model_fields[field].annotation, TaskReadSchema.model_fields[field])
+            for field in fields}
+
+
+TaskListItemSchema = create_model(
+    "TaskListItemSchema",
+    __doc__="Задача в списке: без result и errors, с параметром fields - только запрошенные поля и id",
+    __config__=ConfigDict(from_attributes=True),
+    **_task_fields(LIST_DEFAULT_FIELDS))
+
+
+@lru_cache(maxsize=256)
+def partial_task_schema(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Схема ответа только с запрошенными полями задачи"""
+    if fields == TASK_FIELDS:
+        return TaskReadSchema
+    if fields == LIST_DEFAULT_FIELDS:
+        return TaskListItemSchema
+
+    return create_model(f"TaskPartial_{'_'.join(fields)}", __config__=ConfigDict(from_attributes=True),
+                        **_task_fields(fields))
+
+
+class TaskBatchCreateSchema(BaseModel):
+    """Схема для пакетного создания задач"""
+
+    tasks: list[TaskCreateSchema] = Field(min_length=1, max_length=10000, description="Задачи для создания")
+
+
+class TaskBatchItemResult(BaseModel):
+    """Результат создания одной задачи из пакета"""
+
+    index: int = Field(examples=[0], description="Позиция задачи в запросе")
+    id: Optional[int] = Field(default=None, examples=[42], description="ID созданной задачи")
+    result: Literal["created", "duplicate"] = Field(examples=["created"],
+                                                    description="created - задача создана, "
+                                                                "duplicate - задача с таким описанием уже есть")
+
+
+class TaskBatchCreateResponse(BaseModel):
+    """Схема ответа пакетного создания задач"""
+
+    created: int = Field(examples=[2], description="Количество созданных задач")
+    duplicates: int = Field(examples=[1], description="Количество дубликатов")
+    items: list[TaskBatchItemResult]
+
+
 class TaskFilter(BaseModel):
     """Схема для получения списка задач с фильтрацией и пагинацией"""
 
@@ -79,12 +144,73 @@ class TaskFilter(BaseModel):
                                          description="Фильтр по приоритету задачи")
     status: Optional[Status] = Field(default=None, examples=[Priority.LOW, Priority.MEDIUM, Priority.HIGH],
                                      description="Фильтр по статусу задачи")
-    created_at: Optional[datetime] = Field(default=None, examples=["2025-12-12T23:59:59Z"],
-                                           description="Дата и время создания задачи (UTC)")
-    started_at: Optional[datetime] = Field(default=None, examples=["2025-12-12T23:59:59Z"],
-                                           description="Дата и время начала выпонения задачи (UTC)")
-    completed_at: Optional[datetime] = Field(default=None, examples=["2025-12-12T23:59:59Z"],
-                                             description="Дата и время завершения выпонения задачи (UTC)")
+    created_after: Optional[datetime] = Field(default=None, examples=["2025-12-01T00:00:00Z"],
+                                              description="Задачи, созданные не раньше указанного момента (UTC)")
+    created_before: Optional[datetime] = Field(default=None, examples=["2025-12-12T23:59:59Z"],
+                                               description="Задачи, созданные раньше указанного момента (UTC)")
+    started_after: Optional[datetime] = Field(default=None, examples=["2025-12-01T00:00:00Z"],
+                                              description="Задачи, начатые не раньше указанного момента (UTC)")
+    started_before: Optional[datetime] = Field(default=None, examples=["2025-12-12T23:59:59Z"],
+                                               description="Задачи, начатые раньше указанного момента (UTC)")
+    completed_after: Optional[datetime] = Field(default=None, examples=["2025-12-01T00:00:00Z"],
+                                                description="Задачи, завершенные не раньше указанного момента (UTC)")
+    completed_before: Optional[datetime] = Field(default=None, examples=["2025-12-12T23:59:59Z"],
+                                                 description="Задачи, завершенные раньше указанного момента (UTC)")
+
+
+class TaskBulkSelection(BaseModel):
+    """Выбор задач для массовой операции: список ID или фильтр"""
+
+    ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=10000, examples=[[1, 2, 3]],
+                                     description="ID задач")
+    filter: Optional[TaskFilter] = Field(default=None, description="Фильтр задач, хотя бы одно условие обязательно")
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Нужно указать либо ids, либо filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("Фильтр должен содержать хотя бы одно условие")
+        return self
+
+
+class TaskBulkResult(BaseModel):
+    """Результат массовой операции над задачами"""
+
+    affected: list[int] = Field(examples=[[1, 3]], description="ID задач, к которым применена операция")
+    skipped: list[int] = Field(default_factory=list, examples=[[2]],
+                               description="ID из запроса, которые не найдены или в неподходящем статусе "
+                                           "(только для выбора по ids)")
+
+
+class TaskStatusBatchRequest(BaseModel):
+    """Схема запроса статусов нескольких задач"""
+
+    ids: list[int] = Field(min_length=1, max_length=10000, examples=[[1, 2, 3]], description="ID задач")
+
+
+class TaskStatusBatchResponse(BaseModel):
+    """Схема ответа со статусами нескольких задач"""
+
+    statuses: dict[int, Status] = Field(examples=[{"1": "completed", "2": "in_progress"}],
+                                        description="Статусы найденных задач по ID")
+    missing: list[int] = Field(default_factory=list, examples=[[3]], description="ID задач, которые не найдены")
+
+
+class TaskSort(str, Enum):
+    ID = "id"
+    CREATED_AT = "created_at"
+    PRIORITY = "priority"
+
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
 
 
 class TaskStatusResponse(BaseModel):
@@ -95,3 +221,13 @@ class TaskStatusResponse(BaseModel):
                                      Status.IN_PROGRESS],
                            json_schema_extra={"x-order": 1,
                                               "x-status-flow": "NEW → PENDING → IN_PROGRESS → COMPLETED/FAILED/CANCELLED"})
+
+
+class CacheStatsResponse(BaseModel):
+    """Схема статистики кэша чтений задач"""
+
+    hits: int = Field(description="Количество попаданий в кэш")
+    misses: int = Field(description="Количество промахов кэша")
+    size: int = Field(description="Текущее количество записей")
+    max_size: int = Field(description="Максимальное количество записей")
+    hit_ratio: float = Field(description="Доля попаданий")
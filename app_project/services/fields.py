@@ -0,0 +1,16 @@
+from app_project.exceptions import ValidationError
+from app_project.schemas.task_schema import TASK_FIELDS
+
+
+def parse_fields(raw: str | None, default: tuple[str, ...] = TASK_FIELDS) -> tuple[str, ...]:
+    if raw is None:
+        return default
+
+    requested = {field.strip() for field in raw.split(",") if field.strip()}
+    unknown = requested.difference(TASK_FIELDS)
+    if unknown:
+        raise ValidationError(message=f"Неизвестные поля: {', '.join(sorted(unknown))}", field="fields", value=raw)
+
+    # id is always returned, the order is canonical so equal sets share one cached schema
+    requested.add("id")
+    return tuple(field for field in TASK_FIELDS if field in requested)
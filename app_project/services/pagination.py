@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from app_project.exceptions import ValidationError
+from app_project.models.models import Priority
+from app_project.schemas.task_schema import SortOrder, TaskSort
+
+
+def encode_cursor(task, sort: TaskSort, order: SortOrder) -> str:
+    value = getattr(task, sort.value)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Priority):
+        value = value.value
+
+    payload = {"s": sort.value, "o": order.value, "v": value, "id": task.id}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: TaskSort, order: SortOrder) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort.value or payload["o"] != order.value:
+            raise ValidationError(message="Курсор получен для другой сортировки", field="cursor")
+
+        if sort == TaskSort.ID:
+            return (int(payload["id"]),)
+        if sort == TaskSort.CREATED_AT:
+            return datetime.fromisoformat(payload["v"]), int(payload["id"])
+        return Priority(payload["v"]), int(payload["id"])
+
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValidationError(message="Некорректный курсор", field="cursor")
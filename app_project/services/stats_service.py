@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+from app_project.config import settings
+from app_project.exceptions import ValidationError
+from app_project.models.models import Priority, Status
+from app_project.repositories.stats_repository import StatsRepository
+from app_project.schemas.stats_schema import LatencyStats, TaskCountItem, TaskStatsResponse
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def percentile_from_buckets(buckets: dict[int, int], quantile: float) -> float | None:
+    """Перцентиль в мс с линейной интерполяцией внутри бакета [2^b, 2^(b+1))"""
+    total = sum(buckets.values())
+    if total <= 0:
+        return None
+
+    rank = quantile * total
+    seen = 0
+    for bucket in sorted(buckets):
+        count = buckets[bucket]
+        if count <= 0:
+            continue
+        if seen + count >= rank:
+            lower = 0.0 if bucket == 0 else float(2 ** bucket)
+            upper = float(2 ** (bucket + 1))
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+
+    return float(2 ** (max(buckets) + 1))
+
+
+def window_start(now: datetime, window_minutes: int) -> datetime:
+    """Первая минута окна, текущая минута входит в окно"""
+    return now.replace(second=0, microsecond=0) - timedelta(minutes=window_minutes - 1)
+
+
+def latency_stats(buckets: dict[int, int]) -> LatencyStats:
+    return LatencyStats(count=sum(buckets.values()),
+                        **{name: percentile_from_buckets(buckets, q) for name, q in PERCENTILES.items()})
+
+
+class StatsService:
+    def __init__(self, repository: StatsRepository):
+        self.repository = repository
+
+    async def get_stats(self, window_minutes: int = 60) -> TaskStatsResponse:
+        max_window = settings.STATS_MAX_WINDOW_MINUTES
+        if window_minutes < 1 or window_minutes > max_window:
+            raise ValidationError(message=f"Окно должно быть от 1 до {max_window} минут",
+                                  field="window_minutes", value=window_minutes)
+
+        counts = await self.repository.get_counts()
+        latency = await self.repository.get_latency_buckets(window_start(datetime.now(timezone.utc), window_minutes))
+
+        by_status = {status: 0 for status in Status}
+        by_priority = {priority: 0 for priority in Priority}
+        for (status, priority), count in counts.items():
+            by_status[status] += count
+            by_priority[priority] += count
+
+        return TaskStatsResponse(
+            total=sum(counts.values()),
+            by_status=by_status,
+            by_priority=by_priority,
+            counts=[TaskCountItem(status=status, priority=priority, count=count)
+                    for (status, priority), count in sorted(counts.items())],
+            window_minutes=window_minutes,
+            wait=latency_stats(latency.get("wait", {})),
+            run=latency_stats(latency.get("run", {})),
+        )
+
+    async def prune_latency_buckets(self, now: datetime | None = None) -> int:
+        """Удаляет минуты, которые не попадают даже в самое длинное окно"""
+        now = now or datetime.now(timezone.utc)
+        return await self.repository.prune_latency_buckets(window_start(now, settings.STATS_MAX_WINDOW_MINUTES))
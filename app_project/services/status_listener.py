@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+
+import asyncpg
+
+from app_project.config import settings
+from app_project.models.models import TASK_STATUS_CHANNEL, Status
+from app_project.services.task_cache import TaskCache
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 1.0
+
+
+@dataclass(frozen=True)
+class StatusEvent:
+    task_id: int
+    status: Status | None  # None - задача удалена
+
+
+class StatusListener:
+    """Одно LISTEN-соединение на процесс API, раздает изменения статусов подписчикам"""
+
+    def __init__(self, cache: TaskCache | None = None, channel: str = TASK_STATUS_CHANNEL):
+        self.cache = cache
+        self.channel = channel
+        self.subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._connection: asyncpg.Connection | None = None
+        self._lost: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self._connect()
+        self._task = asyncio.create_task(self._reconnect_loop())
+
+    async def _connect(self) -> None:
+        self._lost = asyncio.Event()
+        self._connection = await asyncpg.connect(user=settings.POSTGRES_USER, password=settings.POSTGRES_PASSWORD,
+                                                 host=settings.POSTGRES_HOST, port=settings.POSTGRES_PORT,
+                                                 database=settings.POSTGRES_DB)
+        self._connection.add_termination_listener(lambda connection: self._lost.set())
+        await self._connection.add_listener(self.channel, self._on_notify)
+
+    async def _reconnect_loop(self) -> None:
+        while True:
+            await self._lost.wait()
+            logger.warning("Status listener connection lost, reconnecting")
+
+            while True:
+                await asyncio.sleep(RECONNECT_DELAY)
+                try:
+                    await self._connect()
+                    break
+                except Exception as e:
+                    logger.error(f"Status listener reconnect failed: {e}")
+
+            # Notifications sent while disconnected are gone, cached non-final reads may be stale
+            if self.cache is not None:
+                self.cache.invalidate_all()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            status = Status[data["status"]] if data.get("status") is not None else None
+            event = StatusEvent(task_id=int(data["id"]), status=status)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Invalid status notification {payload!r}: {e}")
+            return
+
+        self.publish(event)
+
+    def publish(self, event: StatusEvent) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(event.task_id)
+
+        for queue in self.subscribers.get(event.task_id, ()):
+            queue.put_nowait(event)
+
+    def subscribe(self, task_ids: list[int]) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        for task_id in task_ids:
+            self.subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_ids: list[int], queue: asyncio.Queue) -> None:
+        for task_id in task_ids:
+            queues = self.subscribers.get(task_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[task_id]
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app_project.config import settings
+from app_project.models.models import FINAL_STATUSES, Status
+
+
+class TaskCache:
+    """LRU-кэш чтений задач: завершенные и отмененные живут до вытеснения, остальные - ttl секунд"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any, status: Status) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = None if status in FINAL_STATUSES else time.monotonic() + self.ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, task_id: int) -> None:
+        self._entries.pop(("task", task_id), None)
+        self._entries.pop(("status", task_id), None)
+
+    def invalidate_all(self) -> None:
+        self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size,
+                "hit_ratio": self.hits / total if total else 0.0}
+
+
+task_cache = TaskCache(settings.TASK_CACHE_SIZE, settings.TASK_CACHE_TTL)
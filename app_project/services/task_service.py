@@ -1,47 +1,200 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+from typing import AsyncIterator
+
 from sqlalchemy import Sequence
 
-from app_project.exceptions import ValidationError, ServiceError
-from app_project.models.models import Tasks, Status
+from app_project.config import settings
+from app_project.exceptions import NotFoundError, ValidationError, ServiceError
+from app_project.models.models import FINAL_STATUSES, Tasks, Status
+from app_project.producer.producer import RabbitMQProducer, TaskPublisher
 from app_project.repositories.task_repository import TaskRepository
-from app_project.schemas.task_schema import TaskCreateSchema, TaskFilter
+from app_project.result_store import decode_result
+from app_project.schemas.task_schema import (ExportFormat, SortOrder, TaskBulkResult, TaskBulkSelection,
+                                             TaskCreateSchema, TaskFilter, TaskReadSchema, TaskSort)
+from app_project.services.pagination import decode_cursor, encode_cursor
+from app_project.services.status_listener import StatusListener
+from app_project.services.task_cache import TaskCache
+
+logger = logging.getLogger(__name__)
 
 
 class TaskService:
-    def __init__(self, repository: TaskRepository):
+    def __init__(self, repository: TaskRepository, producer: RabbitMQProducer | None = None,
+                 cache: TaskCache | None = None, listener: StatusListener | None = None,
+                 publisher: TaskPublisher | None = None):
         self.repository = repository
+        self.producer = producer
+        self.publisher = publisher
+        self.cache = cache
+        self.listener = listener
 
-    async def create(self, task: TaskCreateSchema) -> Tasks:
+    async def create(self, task: TaskCreateSchema) -> Tasks | TaskReadSchema:
         model = await self.repository.create(task)
-        return model
 
-    async def get_list(self, filters: TaskFilter, limit: int, cursor_id: int | None) -> Sequence[Tasks]:
+        if self.publisher is None:
+            return model
+
+        # The response reflects the status after publishing, the row is PENDING once the broker confirmed it
+        created = TaskReadSchema.model_validate(model)
+        if created.id in await self.publisher.publish([created.id]):
+            return created.model_copy(update={"status": Status.PENDING})
+        return created
+
+    async def create_many(self, tasks: list[TaskCreateSchema]) -> list[int | None]:
+        task_ids = await self.repository.create_many(tasks)
+
+        if self.publisher is not None:
+            await self.publisher.publish([task_id for task_id in task_ids if task_id is not None])
+
+        return task_ids
+
+    async def get_list(self, filters: TaskFilter, limit: int, cursor: str | None = None, sort: TaskSort = TaskSort.ID,
+                       order: SortOrder = SortOrder.ASC,
+                       fields: tuple[str, ...] | None = None) -> tuple[Sequence[Tasks], str | None]:
 
         if limit < 1 or limit > 50:
             raise ValidationError(message="Лимит должен быть от 1 до 50", field="limit", value=limit)
 
-        if cursor_id is not None and cursor_id < 0:
-            raise ValidationError(message="Cursor ID не может быть отрицательным", field="cursor_id", value=cursor_id)
+        after = decode_cursor(cursor, sort, order) if cursor is not None else None
+
+        columns = None
+        if fields is not None:
+            # The cursor is built from the sort key, it is selected even when not requested
+            columns = tuple(dict.fromkeys((*fields, "id", sort.value)))
+
+        lst_tasks = await self.repository.filtres_list_paginate(filters, limit, sort, order, after, columns)
+
+        next_cursor = encode_cursor(lst_tasks[-1], sort, order) if len(lst_tasks) == limit else None
+        return lst_tasks, next_cursor
+
+    async def export(self, filters: TaskFilter, export_format: ExportFormat) -> AsyncIterator[str]:
+        columns = list(TaskReadSchema.model_fields)
+
+        if export_format == ExportFormat.CSV:
+            yield self._csv_chunk([columns])
+
+        async for partition in self.repository.stream_filtered(filters):
+            rows = [TaskReadSchema.model_validate(task) for task in partition]
+
+            if export_format == ExportFormat.CSV:
+                yield self._csv_chunk([self._csv_row(row.model_dump(mode="json"), columns) for row in rows])
+            else:
+                yield "".join(row.model_dump_json() + "\n" for row in rows)
 
-        lst_tasks = await self.repository.filtres_list_paginate(filters, limit, cursor_id)
-        return lst_tasks
+    @staticmethod
+    def _csv_row(data: dict, columns: list[str]) -> list:
+        return [json.dumps(data[column]) if isinstance(data[column], dict) else data[column] for column in columns]
 
-    async def get_by_id(self, task_id: int) -> Tasks:
+    @staticmethod
+    def _csv_chunk(rows: list[list]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    async def get_by_id(self, task_id: int, fields: tuple[str, ...] | None = None) -> Tasks | TaskReadSchema:
         if task_id <= 0:
             raise ValidationError(message="ID задачи должен быть положительным числом", field="task_id", value=task_id)
 
-        model = await self.repository.get_by_id(task_id)
-        return model
+        cached = self.cache.get(("task", task_id)) if self.cache is not None else None
+        if cached is not None:
+            return cached
+
+        if fields is not None:
+            if "result" not in fields:
+                return await self.repository.get_by_id(task_id, fields)
+            row = await self.repository.get_by_id(task_id, tuple(dict.fromkeys((*fields, "result_external"))))
+            if not row.result_external:
+                return row
+            return {**row._mapping, "result": await self._load_result(task_id)}
+
+        task = await self.repository.get_by_id(task_id)
+        if task.result_external:
+            # Offloaded results are large, they are decompressed per request and never cached
+            task = TaskReadSchema.model_validate(task)
+            task.result = await self._load_result(task_id)
+            return task
+
+        if self.cache is None:
+            return task
+
+        task = TaskReadSchema.model_validate(task)
+        self.cache.set(("task", task_id), task, task.status)
+        return task
+
+    async def _load_result(self, task_id: int) -> dict | None:
+        blob = await self.repository.get_result_blob(task_id)
+        if blob is None:
+            return None
+        # Decompressing and parsing a large result would stall every other request on the loop
+        return await asyncio.to_thread(decode_result, blob)
 
     async def delete_by_id(self, task_id: int) -> None:
         if task_id <= 0:
             raise ValidationError(message="ID задачи должен быть положительным числом", field="task_id", value=task_id)
 
-        task = await self.repository.get_by_id(task_id)
-
-        if task.status == Status.COMPLETED:
+        if not await self.repository.delete_by_id(task_id):
+            # Raises NotFoundError when the task does not exist, otherwise it is completed
+            await self.repository.get_status_by_id(task_id)
             raise ServiceError(message="Нельзя удалить завершенную задачу", code="CANNOT_DELETE_COMPLETED")
 
-        await self.repository.delete_by_id(task_id)
+        self._invalidate(task_id)
+
+    async def cancel(self, task_id: int) -> None:
+        if task_id <= 0:
+            raise ValidationError(message="ID задачи должен быть положительным числом", field="task_id", value=task_id)
+
+        if not await self.repository.cancel_by_id(task_id):
+            status = await self.repository.get_status_by_id(task_id)
+            raise ServiceError(message=f"Нельзя отменить задачу в статусе {status.value}", code="CANNOT_CANCEL")
+
+        self._invalidate(task_id)
+        await self._broadcast_cancel([task_id])
+
+    async def cancel_many(self, selection: TaskBulkSelection) -> TaskBulkResult:
+        cancelled = await self.repository.cancel_many(selection.ids, selection.filter)
+        affected = list(cancelled)
+        self._invalidate_many(affected)
+        # NEW tasks were never published, no consumer can be running them
+        await self._broadcast_cancel([task_id for task_id, status in cancelled.items()
+                                      if status in (Status.PENDING, Status.IN_PROGRESS)])
+        return self._bulk_result(selection, affected)
+
+    async def delete_many(self, selection: TaskBulkSelection) -> TaskBulkResult:
+        affected = await self.repository.delete_many(selection.ids, selection.filter)
+        self._invalidate_many(affected)
+        return self._bulk_result(selection, affected)
+
+    async def requeue_failed(self, selection: TaskBulkSelection) -> TaskBulkResult:
+        affected = await self.repository.requeue_failed(selection.ids, selection.filter)
+        self._invalidate_many(affected)
+
+        if self.publisher is not None:
+            await self.publisher.publish(affected)
+
+        return self._bulk_result(selection, affected)
+
+    async def _broadcast_cancel(self, task_ids: list[int]) -> None:
+        if self.producer is None or not task_ids:
+            return
+
+        try:
+            await self.producer.broadcast_cancel(task_ids)
+        except Exception as e:
+            logger.error(f"Cancel broadcast for tasks {task_ids} failed: {e}")
+
+    @staticmethod
+    def _bulk_result(selection: TaskBulkSelection, affected: list[int]) -> TaskBulkResult:
+        if selection.ids is None:
+            return TaskBulkResult(affected=affected)
+
+        affected_ids = set(affected)
+        requested = list(dict.fromkeys(selection.ids))
+        return TaskBulkResult(affected=[task_id for task_id in requested if task_id in affected_ids],
+                              skipped=[task_id for task_id in requested if task_id not in affected_ids])
 
     async def get_status(self, task_id: int) -> Status:
 
@@ -52,4 +205,104 @@ class TaskService:
                 value=task_id
             )
 
-        return await self.repository.get_status_by_id(task_id)
+        if self.cache is None:
+            return await self.repository.get_status_by_id(task_id)
+
+        status = self.cache.get(("status", task_id))
+        if status is None:
+            status = await self.repository.get_status_by_id(task_id)
+            self.cache.set(("status", task_id), status, status)
+        return status
+
+    async def get_statuses(self, task_ids: list[int]) -> tuple[dict[int, Status], list[int]]:
+        task_ids = list(dict.fromkeys(task_ids))
+        if any(task_id <= 0 for task_id in task_ids):
+            raise ValidationError(message="ID задачи должен быть положительным числом", field="ids")
+
+        statuses = {}
+        if self.cache is not None:
+            for task_id in task_ids:
+                status = self.cache.get(("status", task_id))
+                if status is not None:
+                    statuses[task_id] = status
+
+        unresolved = [task_id for task_id in task_ids if task_id not in statuses]
+        if unresolved:
+            found = await self.repository.get_statuses_by_ids(unresolved)
+            statuses.update(found)
+            if self.cache is not None:
+                for task_id, status in found.items():
+                    self.cache.set(("status", task_id), status, status)
+
+        ordered = {task_id: statuses[task_id] for task_id in task_ids if task_id in statuses}
+        return ordered, [task_id for task_id in task_ids if task_id not in statuses]
+
+    async def watch_statuses(self, task_ids: list[int]) -> AsyncIterator[str]:
+        if self.listener is None:
+            raise ServiceError(message="Подписка на статусы задач недоступна", code="STATUS_STREAM_UNAVAILABLE")
+
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids or len(task_ids) > settings.SSE_MAX_TASKS:
+            raise ValidationError(message=f"Количество задач должно быть от 1 до {settings.SSE_MAX_TASKS}",
+                                  field="ids", value=len(task_ids))
+        if any(task_id <= 0 for task_id in task_ids):
+            raise ValidationError(message="ID задачи должен быть положительным числом", field="ids")
+
+        # Subscribe before the snapshot so a transition committed in between is not lost
+        queue = self.listener.subscribe(task_ids)
+        try:
+            statuses = await self.repository.get_statuses_by_ids(task_ids)
+            if not statuses:
+                raise NotFoundError(model="Tasks", object_id=task_ids[0] if len(task_ids) == 1 else task_ids)
+        except Exception:
+            self.listener.unsubscribe(task_ids, queue)
+            raise
+
+        # The stream may stay open for minutes, it must not hold a pooled connection
+        await self.repository.release()
+
+        return self._status_events(task_ids, statuses, queue)
+
+    async def _status_events(self, task_ids: list[int], statuses: dict[int, Status],
+                             queue: asyncio.Queue) -> AsyncIterator[str]:
+        try:
+            for task_id, status in statuses.items():
+                yield self._sse("status", {"id": task_id, "status": status.value})
+
+            missing = [task_id for task_id in task_ids if task_id not in statuses]
+            if missing:
+                yield self._sse("missing", {"ids": missing})
+
+            pending = {task_id for task_id, status in statuses.items() if status not in FINAL_STATUSES}
+            while pending:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event.task_id not in pending:
+                    continue
+
+                if event.status is None:
+                    yield self._sse("deleted", {"id": event.task_id})
+                    pending.discard(event.task_id)
+                    continue
+
+                yield self._sse("status", {"id": event.task_id, "status": event.status.value})
+                if event.status in FINAL_STATUSES:
+                    pending.discard(event.task_id)
+        finally:
+            self.listener.unsubscribe(task_ids, queue)
+
+    @staticmethod
+    def _sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    def _invalidate(self, task_id: int) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(task_id)
+
+    def _invalidate_many(self, task_ids: list[int]) -> None:
+        for task_id in task_ids:
+            self._invalidate(task_id)
@@ -0,0 +1,67 @@
+"""Сравнение стоимости сериализации страницы из 50 задач
+
+Старый путь: model_validate в роуте, повторная проверка response_model в FastAPI и JSONResponse на stdlib json.
+Новый путь: одна проверка через TypeAdapter и dump_json в pydantic-core.
+
+    python benchmarks/bench_list_response.py
+"""
+import json
+import os
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+for name, value in {"POSTGRES_HOST": "localhost", "POSTGRES_PORT": "5432", "POSTGRES_USER": "bench",
+                    "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench"}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app_project.api.v1.responses import list_response  # noqa: E402
+from app_project.models.models import Priority, Status  # noqa: E402
+from app_project.schemas.task_schema import LIST_DEFAULT_FIELDS, TaskReadSchema, partial_task_schema  # noqa: E402
+
+PAGE_SIZE = 50
+ROUNDS = 2000
+
+
+def make_rows() -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    return [SimpleNamespace(id=i, title=f"Задача {i}", description=f"Описание задачи {i}" * 10,
+                            priority=Priority.MEDIUM, status=Status.COMPLETED, created_at=now, started_at=now,
+                            completed_at=now, result={"message": "successfully", "items": list(range(20))},
+                            errors=None, attempts=1)
+            for i in range(PAGE_SIZE)]
+
+
+def old_path(rows, field) -> bytes:
+    content = [TaskReadSchema.model_validate(row) for row in rows]
+    # The same validate + serialize pair fastapi.routing.serialize_response runs for a response_model
+    value, _ = field.validate(content, {}, loc=("response",))
+    return JSONResponse(field.serialize(value, by_alias=True)).body
+
+
+def new_path(rows, schema) -> bytes:
+    return list_response(schema, rows).body
+
+
+def main():
+    rows = make_rows()
+    field = create_model_field(name="Response", type_=list[TaskReadSchema], mode="serialization")
+    default_schema = partial_task_schema(LIST_DEFAULT_FIELDS)
+
+    assert json.loads(old_path(rows, field)) == json.loads(new_path(rows, TaskReadSchema))
+
+    cases = [
+        ("response_model + model_validate + json", lambda: old_path(rows, field)),
+        ("TypeAdapter.dump_json, full rows", lambda: new_path(rows, TaskReadSchema)),
+        ("TypeAdapter.dump_json, default list fields", lambda: new_path(rows, default_schema)),
+    ]
+    for title, case in cases:
+        seconds = min(timeit.repeat(case, number=ROUNDS, repeat=3)) / ROUNDS
+        print(f"{title:45} {seconds * 1e6:9.1f} us/page {seconds * 1e6 / PAGE_SIZE:7.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app_project.consumer.consumer_repository import ConsumerRepository
+from app_project.models.models import Priority, Status
+from app_project.producer.producer_repository import ProducerRepository
+from app_project.repositories.task_repository import TaskRepository
+from app_project.schemas.task_schema import SortOrder, TaskFilter, TaskSort
+from tests.integration.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.skipif(TEST_DATABASE_URL is None, reason="TEST_DATABASE_URL is not set")
+
+
+class Transition:
+    def __init__(self, task_id: int, status: Status, allowed: tuple[Status, ...]):
+        self.task_id = task_id
+        self.status = status
+        self.allowed = allowed
+        self.started = status == Status.IN_PROGRESS
+        self.completed = status == Status.COMPLETED
+        self.result = None
+        self.error = None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters,sort,order,after", [
+    (TaskFilter(), TaskSort.ID, SortOrder.ASC, None),
+    (TaskFilter(), TaskSort.ID, SortOrder.ASC, (90_000,)),
+    (TaskFilter(), TaskSort.CREATED_AT, SortOrder.DESC, (datetime(2025, 2, 1), 44_000)),
+    (TaskFilter(), TaskSort.PRIORITY, SortOrder.ASC, (Priority.MEDIUM, 50_000)),
+    (TaskFilter(status=Status.NEW), TaskSort.ID, SortOrder.ASC, (10_000,)),
+    (TaskFilter(status=Status.FAILED), TaskSort.ID, SortOrder.DESC, None),
+    (TaskFilter(priority=Priority.HIGH), TaskSort.PRIORITY, SortOrder.ASC, (Priority.HIGH, 70_000)),
+    (TaskFilter(priority=Priority.HIGH), TaskSort.ID, SortOrder.ASC, (70_000,)),
+    (TaskFilter(priority=Priority.LOW), TaskSort.ID, SortOrder.DESC, (30_000,)),
+    (TaskFilter(title="sk 42"), TaskSort.ID, SortOrder.ASC, None),
+    (TaskFilter(created_after=datetime(2025, 2, 1, tzinfo=timezone.utc),
+                created_before=datetime(2025, 2, 2, tzinfo=timezone.utc)), TaskSort.CREATED_AT, SortOrder.ASC, None),
+    (TaskFilter(started_after=datetime(2025, 2, 1, tzinfo=timezone.utc),
+                started_before=datetime(2025, 2, 2, tzinfo=timezone.utc)), TaskSort.ID, SortOrder.ASC, None),
+    (TaskFilter(completed_after=datetime(2025, 2, 1, tzinfo=timezone.utc),
+                completed_before=datetime(2025, 2, 2, tzinfo=timezone.utc)), TaskSort.ID, SortOrder.DESC, None),
+])
+async def test_list_pages_use_indexes(plan_session, filters, sort, order, after):
+    session, recorder = plan_session
+
+    await TaskRepository(session).filtres_list_paginate(filters, 50, sort, order, after)
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters", [
+    TaskFilter(status=Status.FAILED),
+    TaskFilter(status=Status.NEW, priority=Priority.HIGH),
+    TaskFilter(created_after=datetime(2025, 2, 1, tzinfo=timezone.utc),
+               created_before=datetime(2025, 2, 2, tzinfo=timezone.utc)),
+])
+async def test_export_stream_uses_indexes(plan_session, filters):
+    session, recorder = plan_session
+
+    exported = [task async for chunk in TaskRepository(session).stream_filtered(filters) for task in chunk]
+
+    assert exported
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_single_task_reads_use_primary_key(plan_session):
+    session, recorder = plan_session
+    repository = TaskRepository(session)
+
+    await repository.get_by_id(12_345)
+    await repository.get_status_by_id(54_321)
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_cancel_uses_primary_key(plan_session):
+    session, recorder = plan_session
+
+    await TaskRepository(session).cancel_by_id(10_100)
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_delete_uses_primary_key(plan_session):
+    session, recorder = plan_session
+
+    await TaskRepository(session).delete_by_id(10_103)
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_producer_claim_uses_new_tasks_index(plan_session):
+    session, recorder = plan_session
+    repository = ProducerRepository()
+
+    tasks = await repository.claim_new_tasks(session, 500)
+    await repository.update_status_to_pending(session, [task.id for task in tasks])
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_status_transitions_use_primary_key(plan_session):
+    session, recorder = plan_session
+
+    await ConsumerRepository().apply_transitions(session, [
+        Transition(101, Status.IN_PROGRESS, (Status.PENDING,)),
+        Transition(202, Status.COMPLETED, (Status.IN_PROGRESS,)),
+        Transition(303, Status.FAILED, (Status.PENDING, Status.IN_PROGRESS)),
+    ])
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_use_indexes(plan_session):
+    session, recorder = plan_session
+    repository = TaskRepository(session)
+
+    await repository.requeue_failed(ids=[103, 203, 303])
+    await repository.cancel_many(filters=TaskFilter(status=Status.NEW))
+    await repository.delete_many(filters=TaskFilter(status=Status.FAILED, title="sk 42"))
+
+    recorder.assert_no_seq_scans()
+
+
+@pytest.mark.asyncio
+async def test_status_batch_uses_primary_key(plan_session):
+    session, recorder = plan_session
+
+    statuses = await TaskRepository(session).get_statuses_by_ids(list(range(1, 2001)) + [10_000_000])
+
+    assert len(statuses) == 2000
+    recorder.assert_no_seq_scans()
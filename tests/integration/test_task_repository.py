@@ -0,0 +1,63 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from app_project.exceptions import AlreadyExistsError
+from app_project.repositories import task_repository
+from app_project.repositories.task_repository import TaskRepository
+from app_project.schemas.task_schema import TaskCreateSchema
+from tests.integration.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.skipif(TEST_DATABASE_URL is None, reason="TEST_DATABASE_URL is not set")
+
+
+def new_task(description: str) -> TaskCreateSchema:
+    return TaskCreateSchema(title="дубликаты", description=description)
+
+
+@pytest_asyncio.fixture
+async def repository(db_session):
+    # The seeded schema only has the 2025 months, new tasks land in the current one
+    await db_session.execute(text("SELECT create_task_partitions(timezone('utc', now())::date, 1)"))
+    return TaskRepository(db_session)
+
+
+@pytest.mark.asyncio
+async def test_create_with_existing_description_raises(repository):
+    await repository.create(new_task("одно и то же описание"))
+
+    with pytest.raises(AlreadyExistsError):
+        await repository.create(new_task("одно и то же описание"))
+
+
+@pytest.mark.asyncio
+async def test_create_with_seeded_description_raises(repository):
+    with pytest.raises(AlreadyExistsError):
+        await repository.create(new_task("description 42"))
+
+
+@pytest.mark.asyncio
+async def test_create_many_reports_duplicates_inside_the_batch(repository):
+    ids = await repository.create_many([new_task("первое"), new_task("второе"), new_task("первое")])
+
+    assert ids[0] is not None and ids[1] is not None
+    assert ids[2] is None
+
+
+@pytest.mark.asyncio
+async def test_create_many_reports_duplicates_across_insert_chunks(repository, monkeypatch):
+    monkeypatch.setattr(task_repository, "INSERT_CHUNK_SIZE", 2)
+
+    ids = await repository.create_many([new_task("а"), new_task("б"), new_task("в"), new_task("а"),
+                                        new_task("description 7")])
+
+    assert [task_id is not None for task_id in ids] == [True, True, True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_create_many_reports_tasks_created_earlier(repository):
+    first = await repository.create_many([new_task("старое"), new_task("новое")])
+    second = await repository.create_many([new_task("новое"), new_task("новейшее")])
+
+    assert None not in first
+    assert second[0] is None and second[1] is not None
@@ -1,9 +1,13 @@
 from datetime import datetime
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from app_project.models.models import Status
+from app_project.api.v1.dependencies import get_stats_service
+from app_project.main import app
+from app_project.models.models import Priority, Status
+from app_project.schemas.stats_schema import LatencyStats, TaskCountItem, TaskStatsResponse
+from app_project.schemas.task_schema import LIST_DEFAULT_FIELDS, ExportFormat, SortOrder, TaskBulkResult, TaskSort
 from tests.unit.conftest import client
 
 
@@ -60,6 +64,15 @@ async def test_delete_task(client, service_mock):
     assert response.json().get("detail") == "deleted"
 
 
+@pytest.mark.asyncio
+async def test_cancel_task(client, service_mock):
+    response = await client.post("/api/v1/tasks/1/cancel")
+
+    assert response.status_code == 200
+    assert response.json().get("status") == "cancelled"
+    service_mock.cancel.assert_awaited_once_with(1)
+
+
 @pytest.mark.asyncio
 async def test_get_list_tasks(client, service_mock):
     mock_tasks = [
@@ -81,7 +94,7 @@ async def test_get_list_tasks(client, service_mock):
          "created_at": datetime.now(),
          "started_at": None, "completed_at": None, "result": {}, "errors": ""}
     ]
-    service_mock.get_list = AsyncMock(return_value=mock_tasks)
+    service_mock.get_list = AsyncMock(return_value=(mock_tasks, None))
     response = await client.get("/api/v1/tasks/")
 
     assert response.status_code == 200
@@ -92,3 +105,175 @@ async def test_get_list_tasks(client, service_mock):
     assert data[0].get("title") == "Task 1"
     assert data[0].get("description") == "description task 1"
     assert data[0].get("status") == "new"
+    assert "x-next-cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_list_tasks_returns_next_cursor(client, service_mock, task_read_schema):
+    service_mock.get_list = AsyncMock(return_value=([task_read_schema], "next-page"))
+
+    response = await client.get("/api/v1/tasks/", params={"limit": 1, "sort": "created_at", "order": "desc",
+                                                          "cursor": "page"})
+
+    assert response.status_code == 200
+    assert response.headers["x-next-cursor"] == "next-page"
+    filters, limit, cursor, sort, order = service_mock.get_list.await_args.args
+    assert (limit, cursor, sort, order) == (1, "page", TaskSort.CREATED_AT, SortOrder.DESC)
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_batch(client, service_mock, task_payload):
+    service_mock.create_many = AsyncMock(return_value=[10, None, 11])
+    payload = {"tasks": [task_payload, task_payload, {**task_payload, "description": "другое описание"}]}
+
+    response = await client.post("/api/v1/tasks/batch", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["duplicates"] == 1
+    assert [item["result"] for item in data["items"]] == ["created", "duplicate", "created"]
+    assert [item["id"] for item in data["items"]] == [10, None, 11]
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_batch_rejects_empty_batch(client, service_mock):
+    response = await client.post("/api/v1/tasks/batch", json={"tasks": []})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_tasks_streams_service_chunks(client, service_mock):
+    async def chunks():
+        yield '{"id": 1}\n'
+        yield '{"id": 2}\n'
+
+    service_mock.export = Mock(return_value=chunks())
+
+    response = await client.get("/api/v1/tasks/export", params={"format": "ndjson", "status": "new"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text.splitlines() == ['{"id": 1}', '{"id": 2}']
+    filters, export_format = service_mock.export.call_args.args
+    assert filters.status == Status.NEW
+    assert export_format == ExportFormat.NDJSON
+
+
+@pytest.mark.asyncio
+async def test_get_cache_stats(client):
+    response = await client.get("/api/v1/tasks/cache/stats")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"hits", "misses", "size", "max_size", "hit_ratio"}
+
+
+@pytest.mark.asyncio
+async def test_stream_task_statuses(client, service_mock):
+    async def events():
+        yield 'event: status\ndata: {"id": 1, "status": "completed"}\n\n'
+
+    service_mock.watch_statuses = AsyncMock(return_value=events())
+
+    response = await client.get("/api/v1/tasks/events", params={"ids": [1, 2]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert service_mock.watch_statuses.await_args.args[0] == [1, 2]
+    assert "event: status" in response.text
+
+
+@pytest.mark.asyncio
+async def test_get_list_tasks_defers_heavy_fields(client, service_mock, task_read_schema):
+    service_mock.get_list = AsyncMock(return_value=([task_read_schema], None))
+
+    response = await client.get("/api/v1/tasks/")
+
+    assert response.status_code == 200
+    assert "result" not in response.json()[0]
+    assert "errors" not in response.json()[0]
+
+
+@pytest.mark.asyncio
+async def test_get_list_tasks_with_fields(client, service_mock, task_read_schema):
+    service_mock.get_list = AsyncMock(return_value=([task_read_schema], None))
+
+    response = await client.get("/api/v1/tasks/", params={"fields": "status"})
+
+    assert response.status_code == 200
+    assert response.json() == [{"status": "new", "id": 1}]
+    assert service_mock.get_list.await_args.kwargs["fields"] == ("status", "id")
+
+
+@pytest.mark.asyncio
+async def test_get_task_with_fields(client, service_mock):
+    response = await client.get("/api/v1/tasks/1", params={"fields": "status,result"})
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "new", "id": 1, "result": None}
+    service_mock.get_by_id.assert_awaited_once_with(1, ("status", "id", "result"))
+
+
+@pytest.mark.asyncio
+async def test_get_task_rejects_unknown_fields(client, service_mock):
+    response = await client.get("/api/v1/tasks/1", params={"fields": "secret"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("action,method", [("cancel", "cancel_many"), ("delete", "delete_many"),
+                                           ("requeue", "requeue_failed")])
+async def test_bulk_actions(client, service_mock, action, method):
+    setattr(service_mock, method, AsyncMock(return_value=TaskBulkResult(affected=[1], skipped=[2])))
+
+    response = await client.post(f"/api/v1/tasks/bulk/{action}", json={"ids": [1, 2]})
+
+    assert response.status_code == 200
+    assert response.json() == {"affected": [1], "skipped": [2]}
+    assert getattr(service_mock, method).await_args.args[0].ids == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_bulk_action_rejects_empty_filter(client, service_mock):
+    response = await client.post("/api/v1/tasks/bulk/delete", json={"filter": {}})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_task_statuses_batch(client, service_mock):
+    service_mock.get_statuses = AsyncMock(return_value=({1: Status.COMPLETED, 2: Status.NEW}, [3]))
+
+    response = await client.post("/api/v1/tasks/status:batch", json={"ids": [1, 2, 3]})
+
+    assert response.status_code == 200
+    assert response.json() == {"statuses": {"1": "completed", "2": "new"}, "missing": [3]}
+    service_mock.get_statuses.assert_awaited_once_with([1, 2, 3])
+
+
+@pytest.mark.asyncio
+async def test_get_task_stats(client):
+    stats = TaskStatsResponse(total=1, by_status={Status.NEW: 1}, by_priority={Priority.LOW: 1},
+                              counts=[TaskCountItem(status=Status.NEW, priority=Priority.LOW, count=1)],
+                              window_minutes=30, wait=LatencyStats(count=0), run=LatencyStats(count=0))
+    stats_service = Mock(get_stats=AsyncMock(return_value=stats))
+    app.dependency_overrides[get_stats_service] = lambda: stats_service
+
+    try:
+        response = await client.get("/api/v1/tasks/stats", params={"window_minutes": 30})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["by_status"] == {"new": 1}
+    stats_service.get_stats.assert_awaited_once_with(30)
+
+
+def test_list_openapi_schema_matches_default_fields():
+    schema = app.openapi()
+    items = schema["paths"]["/api/v1/tasks/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert items["items"]["$ref"].endswith("/TaskListItemSchema")
+    assert tuple(schema["components"]["schemas"]["TaskListItemSchema"]["properties"]) == LIST_DEFAULT_FIELDS
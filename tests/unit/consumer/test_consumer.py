@@ -0,0 +1,232 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from app_project.consumer.consumer import RabbitMQConsumer, TaskCancelled, process_task
+from app_project.consumer.consumer_repository import IllegalTransition
+from app_project.consumer.retry import backoff_delay
+from app_project.models.models import Priority, Status
+from app_project.rabbit_config import mq_settings
+
+
+@pytest.mark.parametrize("concurrency,expected", [
+    (10, {Priority.HIGH: 6, Priority.MEDIUM: 3, Priority.LOW: 1}),
+    (40, {Priority.HIGH: 24, Priority.MEDIUM: 12, Priority.LOW: 4}),
+    (7, {Priority.HIGH: 4, Priority.MEDIUM: 2, Priority.LOW: 1}),
+    (3, {Priority.HIGH: 1, Priority.MEDIUM: 1, Priority.LOW: 1}),
+    (1, {Priority.HIGH: 1, Priority.MEDIUM: 1, Priority.LOW: 1}),
+])
+def test_prefetch_split_by_weights(monkeypatch, concurrency, expected):
+    monkeypatch.setattr(mq_settings, "CONSUMER_CONCURRENCY", concurrency)
+    monkeypatch.setattr(mq_settings, "CONSUMER_QUEUE_WEIGHTS",
+                        {Priority.HIGH: 6, Priority.MEDIUM: 3, Priority.LOW: 1})
+
+    assert {p: RabbitMQConsumer.prefetch_for(p) for p in Priority} == expected
+
+
+@pytest.mark.parametrize("concurrency", range(3, 50))
+def test_prefetch_split_adds_up_to_concurrency(monkeypatch, concurrency):
+    monkeypatch.setattr(mq_settings, "CONSUMER_CONCURRENCY", concurrency)
+    monkeypatch.setattr(mq_settings, "CONSUMER_QUEUE_WEIGHTS",
+                        {Priority.HIGH: 6, Priority.MEDIUM: 3, Priority.LOW: 1})
+
+    shares = {p: RabbitMQConsumer.prefetch_for(p) for p in Priority}
+
+    assert sum(shares.values()) == concurrency
+    assert min(shares.values()) >= 1
+    assert shares[Priority.HIGH] >= shares[Priority.MEDIUM] >= shares[Priority.LOW]
+
+
+class FakeWriter:
+    def __init__(self, rejected: dict | None = None):
+        self.rejected = rejected or {}
+        self.writes = []
+
+    async def write(self, task_id, status, **values):
+        self.writes.append(status)
+        if status in self.rejected:
+            raise IllegalTransition(task_id, status, self.rejected[status])
+        return True
+
+
+@pytest.mark.asyncio
+async def test_process_task_completes_with_handler_result(mocker):
+    mocker.patch("app_project.consumer.consumer.registry.run", AsyncMock(return_value={"ok": True}))
+    writer = FakeWriter()
+
+    assert await process_task({"id": 1, "title": "t"}, writer) is True
+    assert writer.writes == [Status.IN_PROGRESS, Status.COMPLETED]
+
+
+@pytest.mark.asyncio
+async def test_process_task_stops_on_cancelled_task(mocker):
+    run = mocker.patch("app_project.consumer.consumer.registry.run", AsyncMock())
+    writer = FakeWriter(rejected={Status.IN_PROGRESS: Status.CANCELLED})
+
+    with pytest.raises(TaskCancelled):
+        await process_task({"id": 1, "title": "t"}, writer)
+    run.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_task_skips_already_processed_task(mocker):
+    run = mocker.patch("app_project.consumer.consumer.registry.run", AsyncMock())
+    writer = FakeWriter(rejected={Status.IN_PROGRESS: Status.COMPLETED})
+
+    assert await process_task({"id": 1, "title": "t"}, writer) is False
+    run.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_task_propagates_handler_failure(mocker):
+    mocker.patch("app_project.consumer.consumer.registry.run", AsyncMock(side_effect=ValueError("boom")))
+    writer = FakeWriter()
+
+    with pytest.raises(ValueError):
+        await process_task({"id": 1, "title": "t"}, writer)
+    assert writer.writes == [Status.IN_PROGRESS]
+
+
+@pytest.fixture
+def consumer():
+    consumer = RabbitMQConsumer()
+    consumer.channel = Mock(default_exchange=Mock(publish=AsyncMock()))
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_failure_is_retried_through_delay_queue(consumer):
+    consumer.writer = FakeWriter()
+    message = Mock(body=b"{}", ack=AsyncMock(), reject=AsyncMock())
+
+    await consumer.handle_failure(message, {"id": 1, "priority": "high"}, 2, ValueError("boom"))
+
+    assert consumer.writer.writes == [Status.PENDING]
+    published, = consumer.channel.default_exchange.publish.await_args_list
+    assert published.args[0].headers == {"x-attempt": 3}
+    assert published.kwargs["routing_key"] == mq_settings.delay_queue_for("high", 2)
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_last_attempt_is_dead_lettered(consumer):
+    consumer.writer = FakeWriter()
+    message = Mock(body=b"{}", ack=AsyncMock(), reject=AsyncMock())
+
+    await consumer.handle_failure(message, {"id": 1, "priority": "low"}, mq_settings.CONSUMER_MAX_ATTEMPTS,
+                                  ValueError("boom"))
+
+    assert consumer.writer.writes == [Status.FAILED]
+    consumer.channel.default_exchange.publish.assert_not_awaited()
+    message.reject.assert_awaited_once_with(requeue=False)
+
+
+@pytest.mark.asyncio
+async def test_last_attempt_is_requeued_when_failed_status_is_not_written(consumer):
+    consumer.writer = Mock(write=AsyncMock(side_effect=ConnectionError("database is down")))
+    message = Mock(body=b"{}", ack=AsyncMock(), reject=AsyncMock(), nack=AsyncMock())
+
+    await consumer.handle_failure(message, {"id": 1, "priority": "low"}, mq_settings.CONSUMER_MAX_ATTEMPTS,
+                                  ValueError("boom"))
+
+    message.nack.assert_awaited_once_with(requeue=True)
+    message.reject.assert_not_awaited()
+    consumer.channel.default_exchange.publish.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b"not json", b'{"id": 1}', b'{"id": 1, "priority": "urgent"}', b"[1]"])
+async def test_invalid_message_is_dead_lettered(consumer, mocker, body):
+    run = mocker.patch("app_project.consumer.consumer.registry.run", AsyncMock())
+    consumer.writer = FakeWriter()
+    message = Mock(body=body, headers={}, redelivered=False, ack=AsyncMock(), reject=AsyncMock(), nack=AsyncMock())
+
+    await consumer.process_message(message)
+
+    message.reject.assert_awaited_once_with(requeue=False)
+    message.nack.assert_not_awaited()
+    run.assert_not_awaited()
+    assert consumer.writer.writes == []
+
+
+@pytest.mark.asyncio
+async def test_failure_of_cancelled_task_is_dropped(consumer):
+    consumer.writer = FakeWriter(rejected={Status.PENDING: Status.CANCELLED})
+    message = Mock(body=b"{}", ack=AsyncMock(), reject=AsyncMock())
+
+    await consumer.handle_failure(message, {"id": 1, "priority": "low"}, 1, ValueError("boom"))
+
+    consumer.channel.default_exchange.publish.assert_not_awaited()
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.parametrize("attempt,upper", [(1, 1.0), (3, 4.0), (20, 300.0)])
+def test_backoff_delay_is_jittered_exponential(attempt, upper):
+    delays = [backoff_delay(attempt) for _ in range(100)]
+
+    assert all(upper / 2 <= d <= upper for d in delays)
+
+
+@pytest.mark.asyncio
+async def test_cancel_broadcast_stops_running_task(consumer, mocker):
+    started = asyncio.Event()
+
+    async def long_handler(task_data):
+        started.set()
+        await asyncio.sleep(60)
+
+    mocker.patch("app_project.consumer.consumer.registry.run", long_handler)
+    consumer.writer = FakeWriter()
+    message = Mock(body=json.dumps({"id": 5, "title": "t", "priority": "low"}).encode(), headers={}, redelivered=False,
+                   ack=AsyncMock(), reject=AsyncMock())
+
+    processing = asyncio.create_task(consumer.process_message(message))
+    await started.wait()
+
+    cancel = MagicMock(body=json.dumps({"ids": [5]}).encode())
+    await consumer.process_cancel(cancel)
+    await processing
+
+    message.ack.assert_awaited_once()
+    assert consumer.running == {}
+
+
+@pytest.mark.asyncio
+async def test_cancel_reaches_every_delivery_of_the_same_task(consumer, mocker):
+    started = []
+
+    async def long_handler(task_data):
+        started.append(task_data["id"])
+        await asyncio.sleep(60)
+
+    mocker.patch("app_project.consumer.consumer.registry.run", long_handler)
+    consumer.writer = FakeWriter()
+    messages = [Mock(body=json.dumps({"id": 5, "title": "t", "priority": "low"}).encode(), headers={}, redelivered=redelivered,
+                     ack=AsyncMock(), reject=AsyncMock()) for redelivered in (False, True)]
+
+    processing = [asyncio.create_task(consumer.process_message(message)) for message in messages]
+    while len(started) < 2:
+        await asyncio.sleep(0)
+    assert len(consumer.running[5]) == 2
+
+    await consumer.process_cancel(MagicMock(body=json.dumps({"ids": [5]}).encode()))
+    await asyncio.gather(*processing)
+
+    for message in messages:
+        message.ack.assert_awaited_once()
+    assert consumer.running == {}
+
+
+@pytest.mark.asyncio
+async def test_close_shuts_handler_pools_down_off_the_loop(consumer, mocker):
+    consumer.writer = Mock(stop=AsyncMock())
+    shutdown = mocker.patch("app_project.consumer.consumer.registry.shutdown")
+    to_thread = mocker.spy(asyncio, "to_thread")
+
+    await consumer.close()
+
+    consumer.writer.stop.assert_awaited_once()
+    to_thread.assert_awaited_once_with(shutdown)
+    shutdown.assert_called_once()
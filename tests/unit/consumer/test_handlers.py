@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from app_project.consumer.handlers import ExecutorKind, HandlerRegistry
+
+
+def cpu_handler(task_data: dict) -> int:
+    return sum(range(task_data["n"]))
+
+
+def worker_pid(task_data: dict) -> dict:
+    return {"pid": os.getpid()}
+
+
+@pytest.fixture
+def registry():
+    registry = HandlerRegistry()
+    yield registry
+    registry.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_handler_result_is_returned(registry):
+    @registry.register("report")
+    async def report(task_data: dict) -> dict:
+        return {"title": task_data["title"]}
+
+    assert await registry.run({"title": "report"}) == {"title": "report"}
+
+
+@pytest.mark.asyncio
+async def test_thread_handler_non_dict_result_is_wrapped(registry):
+    registry.register("sum", executor=ExecutorKind.THREAD)(cpu_handler)
+
+    assert await registry.run({"title": "sum", "n": 10}) == {"result": 45}
+
+
+@pytest.mark.asyncio
+async def test_process_handler_runs_outside_consumer_process(registry):
+    registry.register("pid", executor=ExecutorKind.PROCESS)(worker_pid)
+
+    result = await registry.run({"title": "pid"})
+
+    assert result["pid"] != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_unknown_title_falls_back_to_default(registry):
+    @registry.register()
+    async def fallback(task_data: dict) -> dict:
+        return {"message": "default"}
+
+    assert await registry.run({"title": "unknown"}) == {"message": "default"}
+
+
+def test_unknown_title_without_default_raises(registry):
+    with pytest.raises(LookupError):
+        registry.get("unknown")
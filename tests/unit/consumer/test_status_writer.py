@@ -0,0 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app_project.config import settings
+from app_project.consumer.consumer_repository import ConsumerRepository, IllegalTransition
+from app_project.consumer.status_writer import StatusTransition, StatusWriter
+from app_project.models.models import Status
+from app_project.result_store import decode_result
+
+
+class FakeRepository:
+    def __init__(self, fail: bool = False, rejected: dict | None = None):
+        self.batches = []
+        self.fail = fail
+        self.rejected = rejected or {}
+
+    async def apply_transitions(self, session, transitions):
+        if self.fail:
+            raise RuntimeError("db is down")
+        self.batches.append([(t.task_id, t.status) for t in transitions])
+        return {t.task_id: self.rejected[t.task_id] for t in transitions if t.task_id in self.rejected}
+
+
+@pytest.fixture
+def session_mock(mocker):
+    session = AsyncMock()
+
+    @asynccontextmanager
+    async def fake_session_context():
+        yield session
+
+    mocker.patch("app_project.consumer.status_writer.session_context", fake_session_context)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_coalesced_into_one_statement(session_mock):
+    repository = FakeRepository()
+    writer = StatusWriter(repository)
+    writer.start()
+
+    results = await asyncio.gather(*(writer.write(i, Status.IN_PROGRESS, started=True) for i in range(1, 51)))
+    await writer.stop()
+
+    assert all(results)
+    assert len(repository.batches) == 1
+    assert len(repository.batches[0]) == 50
+    session_mock.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_same_task_transitions_go_to_separate_batches(session_mock):
+    repository = FakeRepository()
+    writer = StatusWriter(repository)
+
+    first = asyncio.ensure_future(writer.write(1, Status.IN_PROGRESS, started=True))
+    second = asyncio.ensure_future(writer.write(1, Status.COMPLETED, completed=True))
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    assert await first and await second
+    assert repository.batches == [[(1, Status.IN_PROGRESS)], [(1, Status.COMPLETED)]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("current", [Status.CANCELLED, Status.COMPLETED, None])
+async def test_rejected_transition_reports_current_status(session_mock, current):
+    writer = StatusWriter(FakeRepository(rejected={7: current}))
+    writer.start()
+
+    with pytest.raises(IllegalTransition) as error:
+        await writer.write(7, Status.IN_PROGRESS, started=True)
+    await writer.stop()
+
+    assert error.value.current == current
+    assert error.value.status == Status.IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_flush_error_is_raised_to_writers(session_mock):
+    writer = StatusWriter(FakeRepository(fail=True))
+    writer.start()
+
+    with pytest.raises(RuntimeError):
+        await writer.write(1, Status.IN_PROGRESS, started=True)
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_large_results_are_compressed_off_the_event_loop(mocker, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_INLINE_LIMIT", 64)
+    to_thread = mocker.spy(asyncio, "to_thread")
+    session = AsyncMock()
+    session.execute.return_value = []
+    large = {"rows": list(range(100))}
+
+    await ConsumerRepository().apply_transitions(session, [
+        StatusTransition(1, Status.COMPLETED, completed=True, result=large),
+        StatusTransition(2, Status.COMPLETED, completed=True, result={"sum": 45}),
+        StatusTransition(3, Status.IN_PROGRESS, started=True),
+    ])
+
+    to_thread.assert_awaited_once()
+    params = session.execute.await_args.args[1]
+    assert params["results"] == [None, '{"sum":45}', None]
+    assert decode_result(params["blobs"][0]) == large
+    assert params["blobs"][1:] == [None, None]
@@ -0,0 +1,79 @@
+from contextlib import asynccontextmanager
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app_project.config import settings
+from app_project.maintenance.partition_repository import ACTIVE_NAMES, PartitionRepository
+from app_project.maintenance.partitions import retention_cutoff, run_maintenance
+
+
+@pytest.fixture
+def session_mock(mocker):
+    session = AsyncMock()
+
+    @asynccontextmanager
+    async def fake_session_context():
+        yield session
+
+    mocker.patch("app_project.maintenance.partitions.session_context", fake_session_context)
+    return session
+
+
+@pytest.mark.parametrize("today,months,cutoff", [
+    (date(2026, 3, 15), 6, date(2025, 9, 1)),
+    (date(2026, 1, 1), 1, date(2025, 12, 1)),
+    (date(2026, 12, 31), 12, date(2025, 12, 1)),
+])
+def test_retention_cutoff(today, months, cutoff):
+    assert retention_cutoff(today, months) == cutoff
+
+
+@pytest.mark.asyncio
+async def test_only_partitions_older_than_retention_are_detached(session_mock, monkeypatch):
+    monkeypatch.setattr(settings, "PARTITION_RETENTION_MONTHS", 1)
+    monkeypatch.setattr(settings, "PARTITION_DROP_ARCHIVED", False)
+    repo = Mock(create_future_partitions=AsyncMock(return_value=1),
+                count_default_rows=AsyncMock(return_value=0),
+                list_partitions=AsyncMock(return_value={"tasks_p2026_01": date(2026, 1, 1),
+                                                        "tasks_p2025_12": date(2025, 12, 1),
+                                                        "tasks_p2025_11": date(2025, 11, 1),
+                                                        "tasks_p2026_02": date(2026, 2, 1)}),
+                detach_partition=AsyncMock(side_effect=[True, False]))
+
+    summary = await run_maintenance(repo, today=date(2026, 2, 10))
+
+    assert summary["archived"] == ["tasks_p2025_11"]
+    assert summary["kept"] == ["tasks_p2025_12"]
+    assert [call.args[1] for call in repo.detach_partition.await_args_list] == ["tasks_p2025_11", "tasks_p2025_12"]
+    assert repo.detach_partition.await_args.args[2] == settings.PARTITION_ARCHIVE_SCHEMA
+    repo.create_future_partitions.assert_awaited_once_with(session_mock, settings.PARTITION_MONTHS_AHEAD + 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_detach_is_rolled_back_and_kept(session_mock, monkeypatch):
+    monkeypatch.setattr(settings, "PARTITION_RETENTION_MONTHS", 1)
+    repo = Mock(create_future_partitions=AsyncMock(return_value=0),
+                count_default_rows=AsyncMock(return_value=0),
+                list_partitions=AsyncMock(return_value={"tasks_p2025_01": date(2025, 1, 1)}),
+                detach_partition=AsyncMock(side_effect=OperationalError("ALTER TABLE", {}, Exception("lock timeout"))))
+
+    summary = await run_maintenance(repo, today=date(2026, 2, 10))
+
+    assert summary["kept"] == ["tasks_p2025_01"]
+    session_mock.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_partition_with_active_or_failed_tasks_is_not_locked():
+    session = AsyncMock()
+    session.execute.return_value = Mock(scalar_one=Mock(return_value=True))
+
+    detached = await PartitionRepository().detach_partition(session, "tasks_p2025_01", "archive", "5s")
+
+    assert not detached
+    statements = [str(call.args[0]) for call in session.execute.await_args_list]
+    assert len(statements) == 1 and "'FAILED'" in ACTIVE_NAMES and ACTIVE_NAMES in statements[0]
+    session.rollback.assert_awaited_once()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app_project.models.models import Priority, Status
+from app_project.producer.producer import RabbitMQProducer, publish_new_tasks
+from app_project.rabbit_config import mq_settings
+
+
+def make_producer(publish) -> RabbitMQProducer:
+    producer = RabbitMQProducer()
+    producer.exchange = Mock(publish=publish)
+    return producer
+
+
+def nack_ids(*task_ids):
+    async def publish(message, routing_key):
+        await asyncio.sleep(0)
+        if json.loads(message.body)["id"] in task_ids:
+            raise ConnectionError("publish not confirmed")
+    return AsyncMock(side_effect=publish)
+
+
+def make_task(task_id: int) -> Mock:
+    return Mock(id=task_id, title="task", description=f"description {task_id}", priority=Priority.LOW,
+                status=Status.NEW)
+
+
+@pytest.fixture
+def session(mocker):
+    session = Mock(rollback=AsyncMock())
+
+    @asynccontextmanager
+    async def session_context():
+        yield session
+
+    mocker.patch("app_project.producer.producer.session_context", session_context)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_keeps_at_most_window_confirms_in_flight(monkeypatch):
+    monkeypatch.setattr(mq_settings, "PRODUCER_CONFIRM_WINDOW", 3)
+    in_flight = peak = 0
+
+    async def publish(message, routing_key):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    producer = make_producer(AsyncMock(side_effect=publish))
+    messages = [{"id": task_id, "priority": Priority.LOW} for task_id in range(10)]
+
+    confirmed = await producer.publish_batch(messages)
+
+    assert confirmed == list(range(10))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_returns_only_confirmed_ids():
+    producer = make_producer(nack_ids(2, 4))
+    messages = [{"id": task_id, "priority": Priority.HIGH} for task_id in range(1, 6)]
+
+    assert await producer.publish_batch(messages) == [1, 3, 5]
+
+
+@pytest.mark.asyncio
+async def test_only_confirmed_tasks_move_to_pending(session):
+    repo = Mock(claim_new_tasks=AsyncMock(return_value=[make_task(task_id) for task_id in (1, 2, 3)]),
+                update_status_to_pending=AsyncMock())
+
+    confirmed = await publish_new_tasks(make_producer(nack_ids(2)), repo, [1, 2, 3])
+
+    assert confirmed == [1, 3]
+    repo.update_status_to_pending.assert_awaited_once_with(session, [1, 3])
+    session.rollback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_claim_is_rolled_back_when_nothing_is_confirmed(session):
+    repo = Mock(claim_new_tasks=AsyncMock(return_value=[make_task(task_id) for task_id in (1, 2)]),
+                update_status_to_pending=AsyncMock())
+
+    confirmed = await publish_new_tasks(make_producer(nack_ids(1, 2)), repo, [1, 2])
+
+    assert confirmed == []
+    repo.update_status_to_pending.assert_not_awaited()
+    session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cancel_broadcast_is_split_into_batches(monkeypatch):
+    monkeypatch.setattr(mq_settings, "CANCEL_BROADCAST_BATCH_SIZE", 2)
+    producer = RabbitMQProducer()
+    producer.cancel_exchange = Mock(publish=AsyncMock())
+
+    await producer.broadcast_cancel([1, 2, 3, 4, 5])
+
+    sent = [json.loads(call.args[0].body)["ids"] for call in producer.cancel_exchange.publish.await_args_list]
+    assert sent == [[1, 2], [3, 4], [5]]
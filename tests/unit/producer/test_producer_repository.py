@@ -0,0 +1,35 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app_project.producer.producer_repository import ProducerRepository
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.asyncio
+async def test_claim_new_tasks_locks_with_skip_locked():
+    session = Mock(execute=AsyncMock(return_value=Mock()))
+
+    await ProducerRepository().claim_new_tasks(session, 25)
+
+    sql = compile_sql(session.execute.await_args.args[0])
+    assert "WHERE tasks.status = 'NEW'" in sql
+    assert "ORDER BY tasks.id" in sql
+    assert "LIMIT 25" in sql
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
+
+
+@pytest.mark.asyncio
+async def test_claim_new_tasks_restricts_to_given_ids():
+    session = Mock(execute=AsyncMock(return_value=Mock()))
+
+    await ProducerRepository().claim_new_tasks(session, 2, [7, 9])
+
+    sql = compile_sql(session.execute.await_args.args[0])
+    assert "tasks.id IN (7, 9)" in sql
+    assert "LIMIT 2" in sql
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql
+
+from app_project.models.models import Tasks
+from app_project.repositories.task_repository import TaskRepository, escape_like
+from app_project.schemas.task_schema import TaskFilter
+
+
+def compile_filters(filters: TaskFilter):
+    conditions = TaskRepository._build_filters(Tasks, filters.model_dump(exclude_none=True))
+    # A live server has standard_conforming_strings on, the offline dialect would double the backslash
+    dialect = postgresql.dialect()
+    dialect._backslash_escapes = False
+    return and_(*conditions).compile(dialect=dialect)
+
+
+def test_title_filter_is_escaped_substring_match():
+    compiled = compile_filters(TaskFilter(title="50%_off\\"))
+
+    assert "tasks.title ILIKE" in str(compiled)
+    assert "ESCAPE '\\'" in str(compiled)
+    assert compiled.params["title_1"] == "%50\\%\\_off\\\\%"
+
+
+def test_escape_like_keeps_plain_text():
+    assert escape_like("Отчет") == "Отчет"
+
+
+def test_range_filters_are_half_open():
+    moment = datetime(2025, 12, 12, 12, 0, tzinfo=timezone.utc)
+
+    sql = str(compile_filters(TaskFilter(started_after=moment, completed_before=moment)))
+
+    assert "tasks.started_at >= " in sql
+    assert "tasks.completed_at < " in sql
+
+
+def test_created_range_is_converted_to_naive_utc():
+    moment = datetime(2025, 12, 12, 15, 0, tzinfo=timezone(timedelta(hours=3)))
+
+    compiled = compile_filters(TaskFilter(created_after=moment))
+
+    value = next(iter(compiled.params.values()))
+    assert value == datetime(2025, 12, 12, 12, 0)
+    assert value.tzinfo is None
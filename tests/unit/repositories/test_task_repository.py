@@ -0,0 +1,34 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app_project.models.models import Status
+from app_project.repositories.task_repository import TaskRepository
+
+
+@pytest.mark.asyncio
+async def test_requeue_drops_offloaded_results_in_the_same_statement():
+    session = Mock(execute=AsyncMock(return_value=Mock(all=Mock(return_value=[Mock(id=4)]))), commit=AsyncMock())
+
+    requeued = await TaskRepository(session).requeue_failed(ids=[4, 5])
+
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert requeued == [4]
+    assert session.execute.await_count == 1
+    assert "UPDATE tasks SET" in sql
+    assert "DELETE FROM task_results WHERE task_results.task_id IN (SELECT changed.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_cancel_returns_the_status_each_task_had_before():
+    rows = [Mock(id=4, status=Status.IN_PROGRESS), Mock(id=5, status=Status.NEW)]
+    session = Mock(execute=AsyncMock(return_value=Mock(all=Mock(return_value=rows))), commit=AsyncMock())
+
+    cancelled = await TaskRepository(session).cancel_many(ids=[4, 5, 6])
+
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert cancelled == {4: Status.IN_PROGRESS, 5: Status.NEW}
+    assert session.execute.await_count == 1
+    assert "FOR UPDATE" in sql
+    assert "RETURNING tasks.id, before.status" in sql
@@ -0,0 +1,23 @@
+import pytest
+
+from app_project.exceptions import ValidationError
+from app_project.schemas.task_schema import LIST_DEFAULT_FIELDS, TaskReadSchema, partial_task_schema
+from app_project.services.fields import parse_fields
+
+
+def test_parse_fields_adds_id_and_uses_canonical_order():
+    assert parse_fields("status, title") == ("title", "status", "id")
+    assert parse_fields(None, LIST_DEFAULT_FIELDS) == LIST_DEFAULT_FIELDS
+
+
+def test_parse_fields_rejects_unknown_field():
+    with pytest.raises(ValidationError):
+        parse_fields("status,password")
+
+
+def test_partial_schema_is_cached_and_limited_to_fields():
+    schema = partial_task_schema(("status", "id"))
+
+    assert schema is partial_task_schema(("status", "id"))
+    assert list(schema.model_fields) == ["status", "id"]
+    assert partial_task_schema(tuple(TaskReadSchema.model_fields)) is TaskReadSchema
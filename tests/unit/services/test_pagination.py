@@ -0,0 +1,35 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app_project.exceptions import ValidationError
+from app_project.models.models import Priority
+from app_project.schemas.task_schema import SortOrder, TaskSort
+from app_project.services.pagination import decode_cursor, encode_cursor
+
+TASK = SimpleNamespace(id=42, created_at=datetime(2025, 12, 12, 23, 59, 59), priority=Priority.HIGH)
+
+
+@pytest.mark.parametrize("sort,expected", [
+    (TaskSort.ID, (42,)),
+    (TaskSort.CREATED_AT, (datetime(2025, 12, 12, 23, 59, 59), 42)),
+    (TaskSort.PRIORITY, (Priority.HIGH, 42)),
+])
+def test_cursor_round_trip(sort, expected):
+    cursor = encode_cursor(TASK, sort, SortOrder.DESC)
+
+    assert decode_cursor(cursor, sort, SortOrder.DESC) == expected
+
+
+def test_cursor_from_other_sort_is_rejected():
+    cursor = encode_cursor(TASK, TaskSort.ID, SortOrder.ASC)
+
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, TaskSort.PRIORITY, SortOrder.ASC)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "e30"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, TaskSort.ID, SortOrder.ASC)
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app_project.config import settings
+from app_project.exceptions import ValidationError
+from app_project.models.models import Priority, Status
+from app_project.services.stats_service import StatsService, percentile_from_buckets
+
+
+def test_percentile_interpolates_inside_bucket():
+    # 100 samples in [8, 16) ms
+    assert percentile_from_buckets({3: 100}, 0.5) == 12.0
+    assert percentile_from_buckets({3: 100}, 0.99) == pytest.approx(15.92)
+
+
+def test_percentile_walks_buckets_in_order():
+    buckets = {10: 10, 0: 80, 4: 10}
+
+    assert percentile_from_buckets(buckets, 0.5) < 2
+    assert 16 <= percentile_from_buckets(buckets, 0.85) < 32
+    assert 1024 <= percentile_from_buckets(buckets, 0.99) < 2048
+
+
+def test_percentile_of_empty_histogram():
+    assert percentile_from_buckets({}, 0.5) is None
+
+
+@pytest.mark.asyncio
+async def test_get_stats_rolls_up_counts():
+    repository = Mock(get_counts=AsyncMock(return_value={(Status.NEW, Priority.LOW): 3,
+                                                         (Status.COMPLETED, Priority.LOW): 5,
+                                                         (Status.COMPLETED, Priority.HIGH): 2}),
+                      get_latency_buckets=AsyncMock(return_value={"run": {3: 10}}))
+
+    stats = await StatsService(repository).get_stats(15)
+
+    assert stats.total == 10
+    assert stats.by_status[Status.COMPLETED] == 7
+    assert stats.by_status[Status.FAILED] == 0
+    assert stats.by_priority[Priority.LOW] == 8
+    assert stats.run.count == 10
+    assert stats.run.p50 == 12.0
+    assert stats.wait.count == 0
+    assert stats.wait.p50 is None
+
+
+@pytest.mark.asyncio
+async def test_get_stats_rejects_bad_window():
+    with pytest.raises(ValidationError):
+        await StatsService(Mock()).get_stats(0)
+    with pytest.raises(ValidationError):
+        await StatsService(Mock()).get_stats(settings.STATS_MAX_WINDOW_MINUTES + 1)
+
+
+@pytest.mark.asyncio
+async def test_latency_buckets_outside_the_longest_window_are_pruned(monkeypatch):
+    monkeypatch.setattr(settings, "STATS_MAX_WINDOW_MINUTES", 60)
+    repository = Mock(prune_latency_buckets=AsyncMock(return_value=42))
+
+    pruned = await StatsService(repository).prune_latency_buckets(datetime(2026, 2, 10, 12, 30, 45, tzinfo=timezone.utc))
+
+    assert pruned == 42
+    # 11:31 is the first minute a 60 minute window at 12:30 still reads
+    repository.prune_latency_buckets.assert_awaited_once_with(datetime(2026, 2, 10, 11, 31, tzinfo=timezone.utc))
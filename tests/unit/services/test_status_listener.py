@@ -0,0 +1,51 @@
+import json
+
+from app_project.models.models import Status
+from app_project.services.status_listener import StatusEvent, StatusListener
+from app_project.services.task_cache import TaskCache
+
+
+def notify(listener, task_id, status):
+    listener._on_notify(None, 1, "task_status", json.dumps({"id": task_id, "status": status}))
+
+
+def test_notification_fans_out_to_subscribers_and_invalidates_cache():
+    cache = TaskCache(max_size=10, ttl=60.0)
+    cache.set(("status", 1), Status.PENDING, Status.PENDING)
+    listener = StatusListener(cache)
+    first, second = listener.subscribe([1]), listener.subscribe([1, 2])
+
+    notify(listener, 1, "IN_PROGRESS")
+
+    assert first.get_nowait() == StatusEvent(task_id=1, status=Status.IN_PROGRESS)
+    assert second.get_nowait() == StatusEvent(task_id=1, status=Status.IN_PROGRESS)
+    assert cache.get(("status", 1)) is None
+
+
+def test_unsubscribed_queue_gets_nothing():
+    listener = StatusListener()
+    queue = listener.subscribe([1])
+    listener.unsubscribe([1], queue)
+
+    notify(listener, 1, "COMPLETED")
+
+    assert queue.empty()
+    assert listener.subscribers == {}
+
+
+def test_invalid_notification_is_ignored():
+    listener = StatusListener()
+    queue = listener.subscribe([1])
+
+    listener._on_notify(None, 1, "task_status", '{"id": 1, "status": "UNKNOWN"}')
+
+    assert queue.empty()
+
+
+def test_deleted_task_notification_has_no_status():
+    listener = StatusListener()
+    queue = listener.subscribe([1])
+
+    listener._on_notify(None, 1, "task_status", '{"id": 1, "status": null}')
+
+    assert queue.get_nowait() == StatusEvent(task_id=1, status=None)
@@ -0,0 +1,52 @@
+from app_project.models.models import Status
+from app_project.services import task_cache as task_cache_module
+from app_project.services.task_cache import TaskCache
+
+
+def test_final_entries_do_not_expire(monkeypatch):
+    cache = TaskCache(max_size=10, ttl=1.0)
+    now = [100.0]
+    monkeypatch.setattr(task_cache_module.time, "monotonic", lambda: now[0])
+
+    cache.set(("status", 1), Status.COMPLETED, Status.COMPLETED)
+    cache.set(("status", 2), Status.IN_PROGRESS, Status.IN_PROGRESS)
+    # A failed task can be requeued, it expires like any other non-final status
+    cache.set(("status", 3), Status.FAILED, Status.FAILED)
+    now[0] += 5
+
+    assert cache.get(("status", 1)) == Status.COMPLETED
+    assert cache.get(("status", 2)) is None
+    assert cache.get(("status", 3)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["size"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TaskCache(max_size=2, ttl=1.0)
+
+    cache.set(("status", 1), Status.FAILED, Status.FAILED)
+    cache.set(("status", 2), Status.FAILED, Status.FAILED)
+    cache.get(("status", 1))
+    cache.set(("status", 3), Status.FAILED, Status.FAILED)
+
+    assert cache.get(("status", 2)) is None
+    assert cache.get(("status", 1)) == Status.FAILED
+
+
+def test_invalidate_drops_task_and_status():
+    cache = TaskCache(max_size=10, ttl=1.0)
+    cache.set(("task", 1), object(), Status.CANCELLED)
+    cache.set(("status", 1), Status.CANCELLED, Status.CANCELLED)
+
+    cache.invalidate(1)
+
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_size_disables_cache():
+    cache = TaskCache(max_size=0, ttl=1.0)
+
+    cache.set(("status", 1), Status.COMPLETED, Status.COMPLETED)
+
+    assert cache.get(("status", 1)) is None
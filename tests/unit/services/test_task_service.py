@@ -0,0 +1,295 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from pydantic import ValidationError as PydanticValidationError
+
+from app_project.exceptions import ServiceError
+from app_project.models.models import Status
+from app_project.producer.producer import TaskPublisher
+from app_project.config import settings
+from app_project.rabbit_config import mq_settings
+from app_project.result_store import decode_result, encode_result
+from app_project.schemas.task_schema import ExportFormat, TaskBulkResult, TaskBulkSelection, TaskFilter
+from app_project.services.status_listener import StatusEvent, StatusListener
+from app_project.services.task_cache import TaskCache
+from app_project.services.task_service import TaskService
+
+
+@pytest.mark.asyncio
+async def test_create_returns_pending_once_published(task_read_schema, task_payload):
+    repository = Mock(create=AsyncMock(return_value=task_read_schema))
+    publisher = Mock(publish=AsyncMock(return_value={1}))
+
+    created = await TaskService(repository, publisher=publisher).create(task_payload)
+
+    publisher.publish.assert_awaited_once_with([1])
+    assert created.status == Status.PENDING
+    assert task_read_schema.status == Status.NEW
+
+
+@pytest.mark.asyncio
+async def test_create_keeps_new_status_when_publish_not_confirmed(task_read_schema, task_payload):
+    repository = Mock(create=AsyncMock(return_value=task_read_schema))
+    publisher = Mock(publish=AsyncMock(return_value=set()))
+
+    created = await TaskService(repository, publisher=publisher).create(task_payload)
+
+    assert created.status == Status.NEW
+
+
+@pytest.mark.asyncio
+async def test_create_leaves_publishing_to_sweeper_without_publisher(task_read_schema, task_payload):
+    repository = Mock(create=AsyncMock(return_value=task_read_schema))
+
+    created = await TaskService(repository, Mock()).create(task_payload)
+
+    assert created is task_read_schema
+
+
+@pytest.mark.asyncio
+async def test_publisher_publishes_in_producer_batches(mocker, monkeypatch):
+    monkeypatch.setattr(mq_settings, "PRODUCER_BATCH_SIZE", 2)
+    publish = mocker.patch("app_project.producer.producer.publish_new_tasks",
+                           AsyncMock(side_effect=[[1, 2], [], [5]]))
+    producer, repo = Mock(), Mock()
+
+    published = await TaskPublisher(producer, repo).publish([1, 2, 3, 4, 5])
+
+    assert published == {1, 2, 5}
+    assert [call.args[2] for call in publish.await_args_list] == [[1, 2], [3, 4], [5]]
+    assert publish.await_args.args[:2] == (producer, repo)
+
+
+@pytest.mark.asyncio
+async def test_cancel_broadcasts_to_consumers():
+    repository = Mock(cancel_by_id=AsyncMock(return_value=True))
+    producer = Mock(broadcast_cancel=AsyncMock())
+
+    await TaskService(repository, producer).cancel(3)
+
+    producer.broadcast_cancel.assert_awaited_once_with([3])
+
+
+@pytest.mark.asyncio
+async def test_cancel_of_finished_task_is_rejected():
+    repository = Mock(cancel_by_id=AsyncMock(return_value=False),
+                      get_status_by_id=AsyncMock(return_value=Status.COMPLETED))
+    producer = Mock(broadcast_cancel=AsyncMock())
+
+    with pytest.raises(ServiceError):
+        await TaskService(repository, producer).cancel(3)
+    producer.broadcast_cancel.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", [ExportFormat.NDJSON, ExportFormat.CSV])
+async def test_export_writes_each_partition_incrementally(task_read_schema, export_format):
+    async def partitions(filters):
+        yield [task_read_schema]
+        yield [task_read_schema.model_copy(update={"id": 2, "result": {"message": "ok"}})]
+
+    repository = Mock(stream_filtered=partitions)
+
+    chunks = [chunk async for chunk in TaskService(repository).export(TaskFilter(), export_format)]
+
+    lines = "".join(chunks).splitlines()
+    if export_format == ExportFormat.CSV:
+        assert len(chunks) == 3
+        assert lines[0].startswith("title,description,priority,status,id")
+        assert '"{""message"": ""ok""}"' in lines[2]
+    else:
+        assert len(chunks) == 2
+        assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_list_returns_cursor_only_for_full_page(task_read_schema):
+    repository = Mock(filtres_list_paginate=AsyncMock(return_value=[task_read_schema]))
+    service = TaskService(repository)
+
+    _, full_page_cursor = await service.get_list(TaskFilter(), 1)
+    _, last_page_cursor = await service.get_list(TaskFilter(), 2)
+
+    assert full_page_cursor is not None
+    assert last_page_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_status_is_served_from_cache():
+    repository = Mock(get_status_by_id=AsyncMock(return_value=Status.COMPLETED))
+    service = TaskService(repository, cache=TaskCache(max_size=10, ttl=1.0))
+
+    assert await service.get_status(1) == Status.COMPLETED
+    assert await service.get_status(1) == Status.COMPLETED
+
+    repository.get_status_by_id.assert_awaited_once_with(1)
+
+
+@pytest.mark.asyncio
+async def test_cancel_invalidates_cached_task(task_read_schema):
+    cache = TaskCache(max_size=10, ttl=60.0)
+    repository = Mock(get_by_id=AsyncMock(return_value=task_read_schema), cancel_by_id=AsyncMock(return_value=True))
+    service = TaskService(repository, cache=cache)
+
+    await service.get_by_id(1)
+    await service.cancel(1)
+    await service.get_by_id(1)
+
+    assert repository.get_by_id.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_watch_statuses_streams_until_tasks_finish():
+    listener = StatusListener()
+    repository = Mock(get_statuses_by_ids=AsyncMock(return_value={1: Status.PENDING, 2: Status.COMPLETED}),
+                      release=AsyncMock())
+    service = TaskService(repository, listener=listener)
+
+    events = await service.watch_statuses([1, 2, 3])
+    listener.publish(StatusEvent(task_id=1, status=Status.IN_PROGRESS))
+    listener.publish(StatusEvent(task_id=1, status=Status.FAILED))
+    listener.publish(StatusEvent(task_id=1, status=Status.PENDING))
+    listener.publish(StatusEvent(task_id=1, status=Status.COMPLETED))
+    chunks = [chunk async for chunk in events]
+
+    repository.release.assert_awaited_once()
+    assert chunks == [
+        'event: status\ndata: {"id": 1, "status": "pending"}\n\n',
+        'event: status\ndata: {"id": 2, "status": "completed"}\n\n',
+        'event: missing\ndata: {"ids": [3]}\n\n',
+        'event: status\ndata: {"id": 1, "status": "in_progress"}\n\n',
+        'event: status\ndata: {"id": 1, "status": "failed"}\n\n',
+        'event: status\ndata: {"id": 1, "status": "pending"}\n\n',
+        'event: status\ndata: {"id": 1, "status": "completed"}\n\n',
+    ]
+    assert listener.subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_watch_statuses_requires_listener():
+    with pytest.raises(ServiceError):
+        await TaskService(Mock()).watch_statuses([1])
+
+
+@pytest.mark.asyncio
+async def test_delete_is_a_single_statement_on_success():
+    repository = Mock(delete_by_id=AsyncMock(return_value=True), get_by_id=AsyncMock(), get_status_by_id=AsyncMock())
+
+    await TaskService(repository).delete_by_id(5)
+
+    repository.get_by_id.assert_not_awaited()
+    repository.get_status_by_id.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_delete_of_completed_task_is_rejected():
+    repository = Mock(delete_by_id=AsyncMock(return_value=False),
+                      get_status_by_id=AsyncMock(return_value=Status.COMPLETED))
+
+    with pytest.raises(ServiceError):
+        await TaskService(repository).delete_by_id(5)
+
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_reports_skipped_ids_and_broadcasts():
+    repository = Mock(cancel_many=AsyncMock(return_value={3: Status.IN_PROGRESS, 1: Status.PENDING,
+                                                          4: Status.NEW}))
+    producer = Mock(broadcast_cancel=AsyncMock())
+
+    result = await TaskService(repository, producer).cancel_many(TaskBulkSelection(ids=[1, 2, 3, 2, 4]))
+
+    assert result == TaskBulkResult(affected=[1, 3, 4], skipped=[2])
+    repository.cancel_many.assert_awaited_once_with([1, 2, 3, 2, 4], None)
+    producer.broadcast_cancel.assert_awaited_once_with([3, 1])
+
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_of_new_tasks_is_not_broadcast():
+    repository = Mock(cancel_many=AsyncMock(return_value={1: Status.NEW, 2: Status.NEW}))
+    producer = Mock(broadcast_cancel=AsyncMock())
+
+    await TaskService(repository, producer).cancel_many(TaskBulkSelection(filter=TaskFilter(status=Status.NEW)))
+
+    producer.broadcast_cancel.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_requeue_by_filter_publishes_requeued():
+    publisher = Mock(publish=AsyncMock(return_value={4, 5}))
+    repository = Mock(requeue_failed=AsyncMock(return_value=[4, 5]))
+    selection = TaskBulkSelection(filter=TaskFilter(title="отчет"))
+
+    result = await TaskService(repository, Mock(), publisher=publisher).requeue_failed(selection)
+
+    assert result == TaskBulkResult(affected=[4, 5])
+    publisher.publish.assert_awaited_once_with([4, 5])
+
+
+def test_bulk_selection_requires_exactly_one_non_empty_selector():
+    with pytest.raises(PydanticValidationError):
+        TaskBulkSelection()
+    with pytest.raises(PydanticValidationError):
+        TaskBulkSelection(ids=[1], filter=TaskFilter(status=Status.FAILED))
+    with pytest.raises(PydanticValidationError):
+        TaskBulkSelection(filter=TaskFilter())
+
+
+@pytest.mark.asyncio
+async def test_get_statuses_queries_only_uncached_ids():
+    cache = TaskCache(max_size=10, ttl=60.0)
+    cache.set(("status", 2), Status.COMPLETED, Status.COMPLETED)
+    repository = Mock(get_statuses_by_ids=AsyncMock(return_value={1: Status.PENDING}))
+
+    statuses, missing = await TaskService(repository, cache=cache).get_statuses([1, 2, 3, 1])
+
+    repository.get_statuses_by_ids.assert_awaited_once_with([1, 3])
+    assert statuses == {1: Status.PENDING, 2: Status.COMPLETED}
+    assert missing == [3]
+
+
+def test_large_results_are_compressed_and_small_ones_stay_inline(monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_INLINE_LIMIT", 64)
+    large = {"rows": ["значение"] * 100}
+
+    assert encode_result({"sum": 45}) == ('{"sum":45}', None)
+    assert encode_result(None) == (None, None)
+    inline, blob = encode_result(large)
+    assert inline is None
+    assert len(blob) < len(json.dumps(large, ensure_ascii=False).encode())
+    assert decode_result(blob) == large
+
+
+@pytest.mark.asyncio
+async def test_offloaded_result_is_decoded_off_the_loop(task_read_schema, mocker):
+    _, blob = encode_result({"rows": list(range(5000))})
+    task = task_read_schema.model_copy(update={"status": Status.COMPLETED, "result_external": True})
+    repository = Mock(get_by_id=AsyncMock(return_value=task), get_result_blob=AsyncMock(return_value=blob))
+    to_thread = mocker.spy(asyncio, "to_thread")
+
+    loaded = await TaskService(repository).get_by_id(1)
+
+    assert loaded.result == {"rows": list(range(5000))}
+    to_thread.assert_awaited_once_with(decode_result, blob)
+
+
+@pytest.mark.asyncio
+async def test_offloaded_result_is_loaded_only_when_requested(task_read_schema):
+    _, blob = encode_result({"rows": list(range(5000))})
+    task = task_read_schema.model_copy(update={"status": Status.COMPLETED, "result_external": True})
+    row = Mock(result_external=True, _mapping={"id": 1, "result": None, "result_external": True})
+    repository = Mock(get_by_id=AsyncMock(side_effect=[task, Mock(id=1, status=Status.COMPLETED), row]),
+                      get_result_blob=AsyncMock(return_value=blob))
+    cache = TaskCache(max_size=10, ttl=60.0)
+    service = TaskService(repository, cache=cache)
+
+    full = await service.get_by_id(1)
+    await service.get_by_id(1, ("id", "status"))
+    partial = await service.get_by_id(1, ("id", "result"))
+
+    assert full.result == {"rows": list(range(5000))}
+    assert partial["result"] == full.result
+    assert repository.get_by_id.await_args.args == (1, ("id", "result", "result_external"))
+    assert repository.get_result_blob.await_count == 2
+    assert cache.get(("task", 1)) is None